@@ -1,14 +1,19 @@
+import asyncio
 import os
-import threading
-from datetime import datetime, timezone
-from queue import Queue
-from typing import Any
+import tempfile
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+from types import MappingProxyType
+from typing import Any, Iterator, Literal, NamedTuple
+
+import pandas as pd
 
 from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from .config import DEFAULT_MARKET, MarketCode
+from .config import DECIMALS, DEFAULT_MARKET, MarketCode
 from .schemas import (
     DetailRequest,
     ExportRequest,
@@ -16,31 +21,82 @@ from .schemas import (
     SettingsUpdateRequest,
 )
 from .services.market_data import (
+    ExportFormatUnavailable,
     ProgressHook,
+    asset_cooldowns,
+    dates_from_preset,
     build_snapshot_view,
     build_view_df,
+    build_view_spec,
+    dataframe_to_columns,
     dataframe_to_records,
-    get_detail_payload,
+    fetch_all_assets_async,
+    get_detail_payload_async,
     get_market_catalog,
     fetch_all_assets,
     list_market_instruments,
     search_market_instruments,
     snapshot_to_records,
-    to_excel_bytes,
+    to_arrow_bytes,
+    write_excel,
 )
 from .services.fetch_cache import (
+    CachedPayload,
+    FetchFrames,
+    build_export_cache_key,
     build_fetch_cache_key,
+    build_frames_cache_key,
+    cache_age,
     clear_fetch_cache,
+    deserialize_payload,
+    get_export_cache,
     get_fetch_cache,
+    get_frames_cache,
+    get_stale_fetch_cache,
+    mark_stale,
+    serialize_payload,
+    set_export_cache,
     set_fetch_cache,
+    set_frames_cache,
 )
+from .services.async_clients import close_async_clients, loop_local
+from .services.failure_backoff import clear_failure_backoff
+from .services.prewarm import PREWARM_ENABLED, PrewarmTarget, prewarm_is_due, run_prewarm_loop
+from .services.provider_guard import ProviderUnavailable, providers_status
+from .services.http_clients import close_sessions
 from .services.settings_store import (
     build_settings_payload,
     get_runtime_fred_key,
     set_runtime_fred_key,
 )
+from .services.single_flight import AsyncSingleFlight
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    prewarm_task = asyncio.create_task(run_prewarm_loop(_prewarm)) if PREWARM_ENABLED else None
+    yield
+    if prewarm_task is not None:
+        prewarm_task.cancel()
+        try:
+            await prewarm_task
+        except asyncio.CancelledError:
+            pass
+    await close_async_clients()
+    close_sessions()
+
+
+class FastJSONResponse(JSONResponse):
+    # Data endpoints return this directly so FastAPI skips jsonable_encoder's extra walk.
+    def render(self, content: Any) -> bytes:
+        return serialize_payload(content)
 
-app = FastAPI(title="FinBoard API", version="0.1.0")
+
+app = FastAPI(title="FinBoard API", version="0.1.0", lifespan=lifespan)
+
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+EXPORT_SPOOL_MAX_BYTES = int(os.getenv("EXPORT_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+EXPORT_STREAM_CHUNK_BYTES = 64 * 1024
 
 app.add_middleware(
     CORSMiddleware,
@@ -97,10 +153,30 @@ def _meta_payload(payload: FetchRequest, effective_freq: str) -> dict[str, str]:
     }
 
 
-def _build_fetch_response(
-    payload: FetchRequest,
-    progress_hook: ProgressHook | None = None,
-) -> tuple[dict[str, Any], bool]:
+def _skipped_payload(cooldowns: dict[str, float]) -> dict[str, str]:
+    return {
+        label: "skipped: cooling down until "
+        + datetime.fromtimestamp(until, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        for label, until in cooldowns.items()
+    }
+
+
+# "columnar" ships one date array plus one array per instrument and describes the view
+# as metadata instead of repeating every label per row (see _assemble_fetch_payload).
+FetchFormat = Literal["records", "columnar"]
+
+
+class _FetchContext(NamedTuple):
+    cache_key: str
+    selected_assets: list[str]
+    custom_assets: list[dict[str, str]]
+    fred_key: str
+    effective_freq: str
+    wire_format: FetchFormat
+    frames_key: str
+
+
+def _prepare_fetch(payload: FetchRequest, wire_format: FetchFormat = "records") -> _FetchContext:
     if payload.start_date > payload.end_date:
         raise HTTPException(status_code=400, detail="La fecha inicial no puede ser mayor que la final")
 
@@ -122,36 +198,140 @@ def _build_fetch_response(
         inverted_assets=payload.inverted_assets,
         custom_assets=custom_assets,
         fred_key=fred_key,
+        wire_format=wire_format,
     )
-    cached = get_fetch_cache(cache_key)
-    if cached is not None:
-        return cached, True
+    frames_key = _frames_key(payload, selected_assets, custom_assets, fred_key, effective_freq)
+    return _FetchContext(cache_key, selected_assets, custom_assets, fred_key, effective_freq, wire_format, frames_key)
+
 
-    base_df, snapshot_df, failures, resolved_symbols = fetch_all_assets(
+def _frames_key(
+    payload: FetchRequest,
+    selected_assets: list[str],
+    custom_assets: list[dict[str, str]],
+    fred_key: str,
+    effective_freq: str,
+) -> str:
+    return build_frames_cache_key(
         market=payload.market,
-        labels=selected_assets,
-        start=payload.start_date.strftime("%Y-%m-%d"),
-        end=payload.end_date.strftime("%Y-%m-%d"),
-        freq=effective_freq,
-        fred_key=fred_key,
+        start_date=payload.start_date.strftime("%Y-%m-%d"),
+        end_date=payload.end_date.strftime("%Y-%m-%d"),
+        effective_freq=effective_freq,
+        assets=selected_assets,
         custom_assets=custom_assets,
-        progress_hook=progress_hook,
+        fred_key=fred_key,
     )
 
+
+def _fetch_args(payload: FetchRequest, context: _FetchContext) -> dict[str, Any]:
+    return {
+        "market": payload.market,
+        "labels": context.selected_assets,
+        "start": payload.start_date.strftime("%Y-%m-%d"),
+        "end": payload.end_date.strftime("%Y-%m-%d"),
+        "freq": context.effective_freq,
+        "fred_key": context.fred_key,
+        "custom_assets": context.custom_assets,
+    }
+
+
+async def _build_fetch_response_async(
+    payload: FetchRequest,
+    progress_hook: ProgressHook | None = None,
+    force: bool = False,
+    wire_format: FetchFormat = "records",
+) -> tuple[CachedPayload, bool]:
+    context = _prepare_fetch(payload, wire_format)
+    cached = None if force else get_fetch_cache(context.cache_key)
+    if cached is not None:
+        return cached, True
+
+    async def compute(publish: ProgressHook) -> CachedPayload:
+        cached = None if force else get_fetch_cache(context.cache_key)
+        if cached is not None:
+            return cached
+        skipped = _skipped_payload(asset_cooldowns(payload.market, context.selected_assets, context.custom_assets))
+        results = await fetch_all_assets_async(**_fetch_args(payload, context), progress_hook=publish)
+        set_frames_cache(context.frames_key, results)
+        # Building and serializing the payload is CPU-bound; keep it off the event loop.
+        return await asyncio.to_thread(
+            lambda: set_fetch_cache(
+                context.cache_key,
+                _assemble_fetch_payload(payload, context, *results, skipped=skipped),
+            )
+        )
+
+    flights = loop_local("fetch_flights", AsyncSingleFlight)
+    stale = None if force else get_stale_fetch_cache(context.cache_key)
+    if stale is not None:
+        # Stale-while-revalidate: answer now, refresh the entry in a background task on this loop.
+        if not flights.in_flight(context.cache_key):
+            _spawn_background(flights.run(context.cache_key, compute))
+        return mark_stale(stale), True
+
+    entry, leader = await flights.run(context.cache_key, compute, progress_hook)
+    return entry, not leader
+
+
+def _prewarm_request(target: PrewarmTarget) -> FetchRequest:
+    # Mirrors the payload the dashboard sends on first load so the cache keys match.
+    start, end = dates_from_preset(target.preset, date.today())
+    labels = list_market_instruments(target.market)
+    return FetchRequest(
+        market=target.market,
+        start_date=start,
+        end_date=end,
+        frequency=target.frequency,
+        exclude_weekends=True,
+        assets=labels,
+        included_assets=labels,
+        preset=target.preset,
+    )
+
+
+async def _prewarm(target: PrewarmTarget) -> None:
+    request = _prewarm_request(target)
+    cached = get_fetch_cache(_prepare_fetch(request).cache_key)
+    if not prewarm_is_due(None if cached is None else cache_age(cached)):
+        return
+    await _build_fetch_response_async(request, force=True)
+
+
+def _spawn_background(coro: Any) -> asyncio.Task:
+    # Keep a strong reference so the task completes (and fills the cache) even if nobody awaits it.
+    task = asyncio.create_task(coro)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+    return task
+
+
+def _assemble_fetch_payload(
+    payload: FetchRequest,
+    context: _FetchContext,
+    base_df: pd.DataFrame,
+    snapshot_df: pd.DataFrame,
+    failures: list[str],
+    resolved_symbols: dict[str, str],
+    skipped: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    columnar = context.wire_format == "columnar"
+    header = {
+        "meta": _meta_payload(payload, context.effective_freq),
+        "failures": failures,
+        "skipped": skipped or {},
+        "resolved_symbols": resolved_symbols,
+    }
     if base_df.empty:
-        response_payload = {
-            "meta": _meta_payload(payload, effective_freq),
-            "failures": failures,
-            "resolved_symbols": resolved_symbols,
+        empty_series = {"series": dataframe_to_columns(base_df), "view": []}
+        series = empty_series if columnar else {"base_rows": [], "view_rows": []}
+        return {
+            **header,
             "assets_loaded": [],
             "included_assets": [],
-            "base_rows": [],
-            "view_rows": [],
+            **series,
             "snapshot_rows_raw": [],
             "snapshot_rows": [],
         }
-        set_fetch_cache(cache_key, response_payload)
-        return response_payload, False
 
     assets_loaded = list(base_df.columns)
     included_assets = payload.included_assets or assets_loaded
@@ -159,42 +339,71 @@ def _build_fetch_response(
     if not included_assets:
         included_assets = assets_loaded
 
-    view_df = build_view_df(
-        base_df,
-        included_assets,
-        invert_global=payload.invert_global,
-        inverted_labels=set(payload.inverted_assets),
-        market=payload.market,
-    )
+    view_args = {
+        "invert_global": payload.invert_global,
+        "inverted_labels": set(payload.inverted_assets),
+        "market": payload.market,
+    }
+    if columnar:
+        # base_rows and view_rows carry the same numbers; send the base once and describe the view.
+        series = {
+            "series": dataframe_to_columns(base_df),
+            "view": build_view_spec(base_df, included_assets, **view_args),
+            "view_decimals": DECIMALS,
+        }
+    else:
+        series = {
+            "base_rows": dataframe_to_records(base_df),
+            "view_rows": dataframe_to_records(build_view_df(base_df, included_assets, **view_args)),
+        }
 
     snapshot_rows_raw = snapshot_to_records(snapshot_df)
-    snapshot_view = build_snapshot_view(
-        snapshot_df,
-        invert_global=payload.invert_global,
-        inverted_labels=set(payload.inverted_assets),
-        market=payload.market,
-    )
-    snapshot_rows = snapshot_to_records(snapshot_view)
+    snapshot_rows = snapshot_to_records(build_snapshot_view(snapshot_df, **view_args))
 
-    response_payload = {
-        "meta": _meta_payload(payload, effective_freq),
-        "failures": failures,
-        "resolved_symbols": resolved_symbols,
+    return {
+        **header,
         "assets_loaded": assets_loaded,
         "included_assets": included_assets,
-        "base_rows": dataframe_to_records(base_df),
-        "view_rows": dataframe_to_records(view_df),
+        **series,
         "snapshot_rows_raw": snapshot_rows_raw,
         "snapshot_rows": snapshot_rows,
     }
-    set_fetch_cache(cache_key, response_payload)
-    return response_payload, False
+
+
+def _delta_entry(entry: CachedPayload, since: date | None) -> CachedPayload:
+    # Keeps only rows dated on/after `since`; the client drops its own rows from that date and
+    # appends these, so an intraday-updated last bar is replaced too. Snapshot rows stay whole.
+    if since is None:
+        return entry
+    cutoff = since.strftime("%Y-%m-%d")
+    if cutoff <= str(entry.meta.get("sdate", "")):
+        return entry
+
+    payload = deserialize_payload(entry.body)
+    if "series" in payload:
+        series = payload["series"]
+        first = bisect_left(series["dates"], cutoff)
+        payload["series"] = {
+            "dates": series["dates"][first:],
+            "columns": {label: values[first:] for label, values in series["columns"].items()},
+        }
+    else:
+        for key in ("base_rows", "view_rows"):
+            rows = payload[key]
+            payload[key] = rows[bisect_left(rows, cutoff, key=lambda row: row["date"]):]
+
+    payload["meta"].update(delta=True, since=cutoff)
+    return entry._replace(body=serialize_payload(payload), meta=MappingProxyType(payload["meta"]))
 
 
 def _sse_event(event: str, payload: dict[str, Any]) -> str:
-    import json
+    return f"event: {event}\ndata: {serialize_payload(payload).decode()}\n\n"
 
-    return f"event: {event}\\ndata: {json.dumps(payload, ensure_ascii=True)}\\n\\n"
+
+def _sse_result_event(entry: CachedPayload, cache_hit: bool) -> bytes:
+    # Splice the cached JSON body into the event instead of re-serializing it.
+    flag = b"true" if cache_hit else b"false"
+    return b'event: result\ndata: {"response":' + entry.body + b',"cache_hit":' + flag + b"}\n\n"
 
 
 @app.get("/api/health")
@@ -213,6 +422,7 @@ def get_settings() -> dict:
 def update_settings(payload: SettingsUpdateRequest) -> dict:
     set_runtime_fred_key(payload.fred_key)
     clear_fetch_cache()
+    clear_failure_backoff()
     env_key = os.getenv("FRED_KEY", "")
     runtime_key = get_runtime_fred_key()
     result = build_settings_payload(env_key, runtime_key)
@@ -220,13 +430,18 @@ def update_settings(payload: SettingsUpdateRequest) -> dict:
     return result
 
 
+@app.get("/api/providers/status")
+def providers_status_endpoint() -> dict:
+    return {"providers": providers_status()}
+
+
 @app.get("/api/assets")
-def assets(market: MarketCode = DEFAULT_MARKET) -> dict:
-    return {"market": market, "assets": get_market_catalog(market)}
+def assets(market: MarketCode = DEFAULT_MARKET) -> FastJSONResponse:
+    return FastJSONResponse({"market": market, "assets": get_market_catalog(market)})
 
 
 @app.get("/api/instrument-search")
-def instrument_search(q: str, market: MarketCode = DEFAULT_MARKET, limit: int = 12) -> dict:
+def instrument_search(q: str, market: MarketCode = DEFAULT_MARKET, limit: int = 12) -> FastJSONResponse:
     query = q.strip()
     if not query:
         raise HTTPException(status_code=400, detail="Ingresa un texto para buscar instrumentos")
@@ -245,30 +460,37 @@ def instrument_search(q: str, market: MarketCode = DEFAULT_MARKET, limit: int =
     if market != "indices_etfs":
         warnings.append("La busqueda dinamica esta disponible para Indices/ETFs.")
 
-    return {
-        "market": market,
-        "query": query,
-        "count": len(results),
-        "results": results,
-        "warnings": warnings,
-    }
+    return FastJSONResponse(
+        {
+            "market": market,
+            "query": query,
+            "count": len(results),
+            "results": results,
+            "warnings": warnings,
+        }
+    )
 
 
 @app.post("/api/fetch")
-def fetch(payload: FetchRequest) -> dict:
-    response_payload, _ = _build_fetch_response(payload)
-    return response_payload
+async def fetch(payload: FetchRequest, format: FetchFormat = "records", since: date | None = None) -> Response:
+    entry, _ = await _build_fetch_response_async(payload, wire_format=format)
+    entry = await asyncio.to_thread(_delta_entry, entry, since)
+    return Response(content=entry.body, media_type="application/json")
 
 
 @app.post("/api/fetch/stream")
-def fetch_stream(payload: FetchRequest) -> StreamingResponse:
-    def event_generator():
-        event_queue: Queue[dict[str, Any]] = Queue()
+async def fetch_stream(
+    payload: FetchRequest,
+    format: FetchFormat = "records",
+    since: date | None = None,
+) -> StreamingResponse:
+    async def event_generator():
+        event_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
         result_holder: dict[str, Any] = {}
         error_holder: dict[str, Exception] = {}
 
         def on_progress(current: int, total: int, label: str, status: str) -> None:
-            event_queue.put(
+            event_queue.put_nowait(
                 {
                     "current": current,
                     "total": total,
@@ -277,24 +499,27 @@ def fetch_stream(payload: FetchRequest) -> StreamingResponse:
                 }
             )
 
-        def worker() -> None:
+        async def worker() -> None:
             try:
-                response_payload, cache_hit = _build_fetch_response(payload, progress_hook=on_progress)
-                result_holder["response"] = response_payload
+                entry, cache_hit = await _build_fetch_response_async(
+                    payload,
+                    progress_hook=on_progress,
+                    wire_format=format,
+                )
+                result_holder["response"] = entry
                 result_holder["cache_hit"] = cache_hit
             except Exception as exc:  # pragma: no cover - emitted as stream error
                 error_holder["error"] = exc
             finally:
-                event_queue.put({"done": True})
+                event_queue.put_nowait({"done": True})
 
-        thread = threading.Thread(target=worker, daemon=True)
-        thread.start()
+        _spawn_background(worker())
 
         yield _sse_event("progress", {"percent": 3, "stage": "Validando parametros..."})
         last_percent = 3
 
         while True:
-            item = event_queue.get()
+            item = await event_queue.get()
             if item.get("done"):
                 break
 
@@ -312,6 +537,8 @@ def fetch_stream(payload: FetchRequest) -> StreamingResponse:
                 stage = f"Cargado {label} ({current}/{total})"
             elif status == "failed":
                 stage = f"Sin datos {label} ({current}/{total})"
+            elif status == "skipped":
+                stage = f"Omitido {label}: en espera por fallos recientes ({current}/{total})"
             else:
                 stage = "Procesando instrumentos..."
 
@@ -336,7 +563,7 @@ def fetch_stream(payload: FetchRequest) -> StreamingResponse:
             yield _sse_event("error", {"message": message})
             return
 
-        response_payload = result_holder.get("response", {})
+        entry = result_holder["response"]
         cache_hit = bool(result_holder.get("cache_hit", False))
         yield _sse_event(
             "progress",
@@ -346,7 +573,7 @@ def fetch_stream(payload: FetchRequest) -> StreamingResponse:
                 "status": "finalizing",
             },
         )
-        yield _sse_event("result", {"response": response_payload, "cache_hit": cache_hit})
+        yield _sse_result_event(await asyncio.to_thread(_delta_entry, entry, since), cache_hit)
         yield _sse_event(
             "progress",
             {
@@ -368,8 +595,16 @@ def fetch_stream(payload: FetchRequest) -> StreamingResponse:
     )
 
 
-@app.post("/api/export")
-def export_excel(payload: ExportRequest) -> Response:
+class _ExportFrames(NamedTuple):
+    view_df: pd.DataFrame
+    included: list[str]
+    snapshot_df: pd.DataFrame
+    meta: dict[str, Any]
+    resolved_symbols: dict[str, str]
+    custom_assets: list[dict[str, str]]
+
+
+def _load_export_frames(payload: ExportRequest) -> tuple[str, FetchFrames, list[dict[str, str]], str]:
     if payload.start_date > payload.end_date:
         raise HTTPException(status_code=400, detail="La fecha inicial no puede ser mayor que la final")
 
@@ -378,22 +613,48 @@ def export_excel(payload: ExportRequest) -> Response:
     fred_key = _resolve_fred_key()
     effective_freq = "B" if (payload.frequency == "D" and payload.exclude_weekends) else payload.frequency
 
-    base_df, snapshot_df, failures, resolved_symbols = fetch_all_assets(
-        market=payload.market,
-        labels=selected_assets,
-        start=payload.start_date.strftime("%Y-%m-%d"),
-        end=payload.end_date.strftime("%Y-%m-%d"),
-        freq=effective_freq,
-        fred_key=fred_key,
-        custom_assets=custom_assets,
-    )
+    # Same frames /api/fetch just loaded for this window, whatever the presentation options.
+    frames_key = _frames_key(payload, selected_assets, custom_assets, fred_key, effective_freq)
+    frames = get_frames_cache(frames_key)
+    if frames is None:
+        results = fetch_all_assets(
+            market=payload.market,
+            labels=selected_assets,
+            start=payload.start_date.strftime("%Y-%m-%d"),
+            end=payload.end_date.strftime("%Y-%m-%d"),
+            freq=effective_freq,
+            fred_key=fred_key,
+            custom_assets=custom_assets,
+        )
+        frames = set_frames_cache(frames_key, results)
 
-    if base_df.empty:
+    if frames.base_df.empty:
+        failures = frames.failures
         raise HTTPException(
             status_code=400,
             detail=f"No se pudo generar exportación. Fallos: {', '.join(failures) if failures else 'sin datos'}",
         )
+    return frames_key, frames, custom_assets, effective_freq
+
 
+def _export_cache_key(payload: ExportRequest, frames_key: str, frames: FetchFrames, file_format: str) -> str:
+    return build_export_cache_key(
+        frames_key=frames_key,
+        frames=frames,
+        included_assets=payload.included_assets,
+        invert_global=payload.invert_global,
+        inverted_assets=payload.inverted_assets,
+        file_format=file_format,
+    )
+
+
+def _prepare_export(
+    payload: ExportRequest,
+    frames: FetchFrames,
+    custom_assets: list[dict[str, str]],
+    effective_freq: str,
+) -> _ExportFrames:
+    base_df, snapshot_df = frames.base_df, frames.snapshot_df
     assets_loaded = list(base_df.columns)
     included_assets = payload.included_assets or assets_loaded
     included_assets = [label for label in included_assets if label in assets_loaded]
@@ -414,37 +675,98 @@ def export_excel(payload: ExportRequest) -> Response:
         market=payload.market,
     )
 
-    meta = {
-        "market": payload.market,
-        "sdate": payload.start_date.strftime("%Y-%m-%d"),
-        "edate": payload.end_date.strftime("%Y-%m-%d"),
-        "freq": effective_freq,
-        "preset": payload.preset,
-        "last_update_utc": datetime.now(timezone.utc).strftime("%H:%M:%S UTC"),
-    }
+    meta = _meta_payload(payload, effective_freq)
+    return _ExportFrames(view_df, included_assets, snapshot_view, meta, frames.resolved_symbols, custom_assets)
 
-    xlsx = to_excel_bytes(
-        view_df,
-        included_assets,
-        snapshot_view,
-        meta,
-        market=payload.market,
-        resolved_symbols=resolved_symbols,
-        custom_assets=custom_assets,
-    )
-    filename = payload.filename or (
-        f"{payload.market}_view_{effective_freq}_{meta['sdate']}_to_{meta['edate']}.xlsx"
-    )
+
+def _export_filename(payload: ExportRequest, effective_freq: str, extension: str) -> str:
+    sdate = payload.start_date.strftime("%Y-%m-%d")
+    edate = payload.end_date.strftime("%Y-%m-%d")
+    return payload.filename or f"{payload.market}_view_{effective_freq}_{sdate}_to_{edate}.{extension}"
+
+
+def _iter_spooled(spool: Any) -> Iterator[bytes]:
+    try:
+        spool.seek(0)
+        while chunk := spool.read(EXPORT_STREAM_CHUNK_BYTES):
+            yield chunk
+    finally:
+        spool.close()
+
+
+@app.post("/api/export")
+def export_excel(payload: ExportRequest) -> Response:
+    frames_key, fetch_frames, custom_assets, effective_freq = _load_export_frames(payload)
+    export_key = _export_cache_key(payload, frames_key, fetch_frames, "xlsx")
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    headers = {"Content-Disposition": f'attachment; filename="{_export_filename(payload, effective_freq, "xlsx")}"'}
+
+    cached = get_export_cache(export_key)
+    if cached is not None:
+        return Response(content=cached, media_type=media_type, headers=headers)
+
+    frames = _prepare_export(payload, fetch_frames, custom_assets, effective_freq)
+    # Small workbooks stay in memory; large ones roll over to disk instead of growing the worker.
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
+    try:
+        write_excel(
+            spool,
+            frames.view_df,
+            frames.included,
+            frames.snapshot_df,
+            frames.meta,
+            market=payload.market,
+            resolved_symbols=frames.resolved_symbols,
+            custom_assets=frames.custom_assets,
+        )
+        if spool.tell() <= EXPORT_SPOOL_MAX_BYTES:
+            spool.seek(0)
+            set_export_cache(export_key, spool.read())
+    except Exception:
+        spool.close()
+        raise
+
+    return StreamingResponse(_iter_spooled(spool), media_type=media_type, headers=headers)
+
+
+ArrowExportFormat = Literal["arrow", "parquet"]
+_ARROW_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@app.post("/api/export/arrow")
+def export_arrow(payload: ExportRequest, format: ArrowExportFormat = "arrow") -> Response:
+    frames_key, fetch_frames, custom_assets, effective_freq = _load_export_frames(payload)
+    export_key = _export_cache_key(payload, frames_key, fetch_frames, format)
+    content = get_export_cache(export_key)
+    if content is None:
+        frames = _prepare_export(payload, fetch_frames, custom_assets, effective_freq)
+        try:
+            content = to_arrow_bytes(
+                frames.view_df,
+                frames.included,
+                frames.snapshot_df,
+                frames.meta,
+                market=payload.market,
+                resolved_symbols=frames.resolved_symbols,
+                custom_assets=frames.custom_assets,
+                file_format=format,
+            )
+        except ExportFormatUnavailable as exc:
+            raise HTTPException(status_code=501, detail=str(exc)) from exc
+        set_export_cache(export_key, content)
 
     return Response(
-        content=xlsx,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        content=content,
+        media_type=_ARROW_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{_export_filename(payload, effective_freq, format)}"'},
     )
 
 
 @app.post("/api/detail")
-def detail(payload: DetailRequest) -> dict:
+async def detail(payload: DetailRequest, format: FetchFormat = "records") -> FastJSONResponse:
     if payload.start_date > payload.end_date:
         raise HTTPException(status_code=400, detail="La fecha inicial no puede ser mayor que la final")
 
@@ -462,7 +784,7 @@ def detail(payload: DetailRequest) -> dict:
     fred_key = _resolve_fred_key()
 
     try:
-        detail_payload = get_detail_payload(
+        detail_payload = await get_detail_payload_async(
             market=payload.market,
             instrument=payload.instrument,
             start=payload.start_date.strftime("%Y-%m-%d"),
@@ -472,9 +794,12 @@ def detail(payload: DetailRequest) -> dict:
             fred_key=fred_key,
             invert=payload.invert,
             custom_assets=custom_assets,
+            history_format=format,
         )
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ProviderUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
 
     detail_payload["last_update_utc"] = datetime.now(timezone.utc).strftime("%H:%M:%S UTC")
-    return detail_payload
+    return FastJSONResponse(detail_payload)
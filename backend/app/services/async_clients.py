@@ -0,0 +1,72 @@
+import asyncio
+from typing import Any, Callable, TypeVar
+from weakref import WeakKeyDictionary
+
+import httpx
+
+from .http_clients import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_POOL_SIZE,
+    HTTP_READ_TIMEOUT,
+    HTTP_RETRIES,
+    Timeout,
+)
+from .provider_guard import PROVIDER_FAILURE_STATUSES, guarded_call_async
+
+T = TypeVar("T")
+
+# Async primitives (clients, semaphores, flights) are bound to the loop that uses
+# them, so each running loop gets its own set instead of module-level singletons.
+_LOOP_STATE: "WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, Any]]" = WeakKeyDictionary()
+
+
+def loop_local(name: str, factory: Callable[[], T]) -> T:
+    loop = asyncio.get_running_loop()
+    state = _LOOP_STATE.setdefault(loop, {})
+    if name not in state:
+        state[name] = factory()
+    return state[name]
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=max(1, HTTP_POOL_SIZE),
+            max_keepalive_connections=max(1, HTTP_POOL_SIZE),
+        ),
+        transport=httpx.AsyncHTTPTransport(retries=HTTP_RETRIES),
+        follow_redirects=True,
+    )
+
+
+def get_async_client(provider: str) -> httpx.AsyncClient:
+    return loop_local(f"client:{provider}", _build_client)
+
+
+async def provider_get_async(
+    provider: str,
+    url: str,
+    *,
+    params: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+    timeout: Timeout | None = None,
+) -> httpx.Response:
+    client = get_async_client(provider)
+    if timeout is None:
+        effective_timeout = client.timeout
+    elif isinstance(timeout, tuple):
+        effective_timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+    else:
+        effective_timeout = httpx.Timeout(timeout)
+    return await guarded_call_async(
+        provider,
+        lambda: client.get(url, params=params, headers=headers, timeout=effective_timeout),
+        is_failure=lambda response: response.status_code in PROVIDER_FAILURE_STATUSES,
+    )
+
+
+async def close_async_clients() -> None:
+    state = _LOOP_STATE.get(asyncio.get_running_loop(), {})
+    for name in [key for key in state if key.startswith("client:")]:
+        await state.pop(name).aclose()
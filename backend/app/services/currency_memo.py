@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+DEFAULT_CURRENCY_MEMO_PATH = Path(__file__).resolve().parents[2] / ".currency_winners.json"
+CURRENCY_MEMO_PATH = Path(os.getenv("CURRENCY_MEMO_PATH", str(DEFAULT_CURRENCY_MEMO_PATH)))
+
+_LOCK = threading.Lock()
+_WINNERS: dict[str, str] | None = None
+
+
+def _read_memo_file() -> dict[str, str]:
+    if not CURRENCY_MEMO_PATH.exists():
+        return {}
+
+    try:
+        payload = json.loads(CURRENCY_MEMO_PATH.read_text(encoding="utf-8"))
+        if isinstance(payload, dict):
+            return {str(pair): str(ticker) for pair, ticker in payload.items()}
+    except Exception:
+        return {}
+
+    return {}
+
+
+def _winners() -> dict[str, str]:
+    global _WINNERS
+    if _WINNERS is None:
+        _WINNERS = _read_memo_file()
+    return _WINNERS
+
+
+def get_currency_winner(pair: str) -> str | None:
+    with _LOCK:
+        return _winners().get(pair)
+
+
+def remember_currency_winner(pair: str, ticker: str) -> None:
+    with _LOCK:
+        winners = _winners()
+        if winners.get(pair) == ticker:
+            return
+        winners[pair] = ticker
+        try:
+            CURRENCY_MEMO_PATH.parent.mkdir(parents=True, exist_ok=True)
+            CURRENCY_MEMO_PATH.write_text(json.dumps(winners, ensure_ascii=True, indent=2), encoding="utf-8")
+        except OSError:
+            pass
+
+
+def reset_currency_memo() -> None:
+    global _WINNERS
+    with _LOCK:
+        _WINNERS = None
@@ -0,0 +1,59 @@
+import datetime as dt
+import os
+import threading
+import time
+from typing import NamedTuple
+
+FAILURE_BACKOFF_BASE_SECONDS = int(os.getenv("FAILURE_BACKOFF_BASE_SECONDS", "60"))
+FAILURE_BACKOFF_MAX_SECONDS = int(os.getenv("FAILURE_BACKOFF_MAX_SECONDS", "3600"))
+# Shorter windows can legitimately hold no bars (weekends, holidays), so an empty result there is not a failure.
+FAILURE_BACKOFF_MIN_WINDOW_DAYS = int(os.getenv("FAILURE_BACKOFF_MIN_WINDOW_DAYS", "7"))
+
+FailureKey = tuple[str, str]
+
+
+class _Failure(NamedTuple):
+    count: int
+    until: float
+
+
+_LOCK = threading.Lock()
+_FAILURES: dict[FailureKey, _Failure] = {}
+
+
+def _now() -> float:
+    return time.time()
+
+
+def is_meaningful_miss(start: str, end: str) -> bool:
+    window = dt.date.fromisoformat(end) - dt.date.fromisoformat(start)
+    return window.days + 1 >= FAILURE_BACKOFF_MIN_WINDOW_DAYS
+
+
+def cooldown_until(source: str, symbol: str) -> float | None:
+    with _LOCK:
+        failure = _FAILURES.get((source, symbol))
+    if failure is None or failure.until <= _now():
+        return None
+    return failure.until
+
+
+def record_failure(source: str, symbol: str) -> float:
+    # Each consecutive miss doubles the window: base, 2*base, 4*base ... capped at the max.
+    with _LOCK:
+        previous = _FAILURES.get((source, symbol))
+        count = (previous.count if previous else 0) + 1
+        window = min(FAILURE_BACKOFF_BASE_SECONDS * 2 ** (count - 1), FAILURE_BACKOFF_MAX_SECONDS)
+        failure = _Failure(count, _now() + window)
+        _FAILURES[(source, symbol)] = failure
+    return failure.until
+
+
+def record_success(source: str, symbol: str) -> None:
+    with _LOCK:
+        _FAILURES.pop((source, symbol), None)
+
+
+def clear_failure_backoff() -> None:
+    with _LOCK:
+        _FAILURES.clear()
@@ -1,36 +1,292 @@
-import copy
+import datetime as dt
 import hashlib
+import heapq
 import json
 import os
+import sqlite3
+import sys
 import threading
 import time
-from typing import Any
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used when it is missing
+    orjson = None
 
 DEFAULT_FETCH_CACHE_TTL = int(os.getenv("FETCH_CACHE_TTL_SECONDS", "120"))
 DEFAULT_FETCH_CACHE_MAX_ITEMS = int(os.getenv("FETCH_CACHE_MAX_ITEMS", "256"))
+DEFAULT_FETCH_CACHE_MAX_BYTES = int(os.getenv("FETCH_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Expired /api/fetch payloads stay servable this much longer while a refresh runs (0 disables).
+DEFAULT_FETCH_CACHE_MAX_STALE = int(os.getenv("FETCH_CACHE_MAX_STALE_SECONDS", "600"))
+# "memory" keeps a per-process cache; "sqlite" shares one file between all workers on the host.
+FETCH_CACHE_BACKEND = os.getenv("FETCH_CACHE_BACKEND", "memory").strip().lower()
+FETCH_CACHE_PATH = Path(
+    os.getenv("FETCH_CACHE_PATH", str(Path(__file__).resolve().parents[2] / ".fetch_cache.sqlite3"))
+)
+DEFAULT_SERIES_CACHE_TTL = int(os.getenv("SERIES_CACHE_TTL_SECONDS", "300"))
+DEFAULT_SERIES_CACHE_MAX_ITEMS = int(os.getenv("SERIES_CACHE_MAX_ITEMS", "512"))
+DEFAULT_SERIES_CACHE_MAX_BYTES = int(os.getenv("SERIES_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+DEFAULT_EXPORT_CACHE_MAX_ITEMS = int(os.getenv("EXPORT_CACHE_MAX_ITEMS", "32"))
+DEFAULT_EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+
+SeriesCacheKey = tuple[str, str, str, str, str]
+
 
-_CACHE_LOCK = threading.Lock()
-_FETCH_CACHE: dict[str, tuple[float, dict[str, Any]]] = {}
+class FetchFrames(NamedTuple):
+    # Raw fetch_all_assets result behind a /api/fetch payload; created_at doubles as the data version.
+    base_df: Any
+    snapshot_df: Any
+    failures: list[str]
+    resolved_symbols: dict[str, str]
+    created_at: float
+
+
+class CachedPayload(NamedTuple):
+    # Final JSON body, served as-is; never mutated once built.
+    body: bytes
+    meta: Mapping[str, Any]
+    created_at: float
 
 
 def _now() -> float:
     return time.time()
 
 
-def _prune_expired(now: float) -> None:
-    expired = [key for key, (expiry, _) in _FETCH_CACHE.items() if expiry <= now]
-    for key in expired:
-        _FETCH_CACHE.pop(key, None)
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def serialize_payload(payload: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        # Native datetime/numpy support, NaN -> null, and no intermediate str.
+        return orjson.dumps(payload, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        payload,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_json_default,
+    ).encode("utf-8")
+
+
+def deserialize_payload(body: bytes) -> dict[str, Any]:
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def freeze_payload(payload: dict[str, Any]) -> CachedPayload:
+    return CachedPayload(
+        body=serialize_payload(payload),
+        meta=MappingProxyType(dict(payload.get("meta") or {})),
+        created_at=_now(),
+    )
+
+
+def _approx_size(value: Any) -> int:
+    if isinstance(value, CachedPayload):
+        return len(value.body)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(_approx_size(item) for item in value)
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(index=True).sum())
+    return sys.getsizeof(value)
+
+
+class LruTtlCache:
+    # OrderedDict keeps recency (O(1) hit/insert/evict); the heap orders expiries
+    # so expired entries are dropped in O(log n) each instead of scanning everything.
+    def __init__(self, max_items: int, max_bytes: int) -> None:
+        self.max_items = max(1, int(max_items))
+        self.max_bytes = max(1, int(max_bytes))
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Any, tuple[float, Any, int]] = OrderedDict()
+        self._expiries: list[tuple[float, int, Any]] = []
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: Any) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+    def _purge_expired(self, now: float) -> None:
+        while self._expiries and self._expiries[0][0] <= now:
+            expiry, _, key = heapq.heappop(self._expiries)
+            entry = self._entries.get(key)
+            # Heap items are invalidated lazily; only drop if it still matches the live entry.
+            if entry is not None and entry[0] == expiry:
+                self._drop(key)
+        if len(self._expiries) > 2 * len(self._entries) + 64:
+            self._expiries = [item for item in self._expiries if self._entries.get(item[2], (None,))[0] == item[0]]
+            heapq.heapify(self._expiries)
+
+    def get(self, key: Any) -> Any | None:
+        now = _now()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Any, value: Any, ttl_seconds: int) -> None:
+        now = _now()
+        expiry = now + max(1, int(ttl_seconds))
+        size = _approx_size(value)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (expiry, value, size)
+            self.total_bytes += size
+            self._seq += 1
+            heapq.heappush(self._expiries, (expiry, self._seq, key))
+            self._purge_expired(now)
+            while self._entries and (len(self._entries) > self.max_items or self.total_bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._expiries.clear()
+            self.total_bytes = 0
+
+
+class SqliteTtlCache:
+    # Same contract as LruTtlCache for CachedPayload values, backed by a WAL-mode
+    # SQLite file so every uvicorn worker on the host shares hits.
+    def __init__(self, path: Path, max_items: int, max_bytes: int) -> None:
+        self.path = Path(path)
+        self.max_items = max(1, int(max_items))
+        self.max_bytes = max(1, int(max_bytes))
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS fetch_cache (
+                    key TEXT PRIMARY KEY,
+                    expiry REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    meta TEXT NOT NULL,
+                    body BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS fetch_cache_expiry ON fetch_cache (expiry);
+                CREATE INDEX IF NOT EXISTS fetch_cache_accessed ON fetch_cache (accessed_at);
+                """
+            )
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        return sqlite3.connect(str(self.path), timeout=30)
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return int(conn.execute("SELECT COUNT(*) FROM fetch_cache").fetchone()[0])
 
+    @property
+    def total_bytes(self) -> int:
+        with closing(self._connect()) as conn:
+            return int(conn.execute("SELECT COALESCE(SUM(size), 0) FROM fetch_cache").fetchone()[0])
 
-def _enforce_max_size() -> None:
-    if len(_FETCH_CACHE) <= DEFAULT_FETCH_CACHE_MAX_ITEMS:
-        return
-    # Evict oldest entries first based on expiry timestamp.
-    for key, _ in sorted(_FETCH_CACHE.items(), key=lambda item: item[1][0])[
-        : max(0, len(_FETCH_CACHE) - DEFAULT_FETCH_CACHE_MAX_ITEMS)
-    ]:
-        _FETCH_CACHE.pop(key, None)
+    def get(self, key: str) -> CachedPayload | None:
+        now = _now()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT body, meta, created_at FROM fetch_cache WHERE key = ? AND expiry > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE fetch_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+        return CachedPayload(body=bytes(row[0]), meta=MappingProxyType(json.loads(row[1])), created_at=float(row[2]))
+
+    def set(self, key: str, value: CachedPayload, ttl_seconds: int) -> None:
+        now = _now()
+        expiry = now + max(1, int(ttl_seconds))
+        meta = json.dumps(dict(value.meta), ensure_ascii=True, default=_json_default)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fetch_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, expiry, now, value.created_at, len(value.body), meta, value.body),
+            )
+            conn.execute("DELETE FROM fetch_cache WHERE expiry <= ?", (now,))
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM fetch_cache").fetchone()
+            if count > self.max_items or total > self.max_bytes:
+                rows = conn.execute("SELECT key, size FROM fetch_cache ORDER BY accessed_at").fetchall()
+                doomed: list[str] = []
+                for old_key, size in rows:
+                    if count <= self.max_items and total <= self.max_bytes:
+                        break
+                    doomed.append(old_key)
+                    count -= 1
+                    total -= size
+                conn.executemany("DELETE FROM fetch_cache WHERE key = ?", [(item,) for item in doomed])
+            conn.commit()
+
+    def clear(self) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM fetch_cache")
+            conn.commit()
+
+
+def _build_fetch_backend() -> LruTtlCache | SqliteTtlCache:
+    if FETCH_CACHE_BACKEND == "sqlite":
+        return SqliteTtlCache(FETCH_CACHE_PATH, DEFAULT_FETCH_CACHE_MAX_ITEMS, DEFAULT_FETCH_CACHE_MAX_BYTES)
+    if FETCH_CACHE_BACKEND != "memory":
+        raise ValueError(f"FETCH_CACHE_BACKEND no soportado: {FETCH_CACHE_BACKEND}")
+    return LruTtlCache(DEFAULT_FETCH_CACHE_MAX_ITEMS, DEFAULT_FETCH_CACHE_MAX_BYTES)
+
+
+_FETCH_CACHE = _build_fetch_backend()
+# Second tier: normalized per-instrument frames, independent of presentation options.
+_SERIES_CACHE = LruTtlCache(DEFAULT_SERIES_CACHE_MAX_ITEMS, DEFAULT_SERIES_CACHE_MAX_BYTES)
+# Per-process tiers shared by /api/fetch and the exports: the frames behind a fetch
+# (keyed without presentation options) and the finished export files.
+_FRAMES_CACHE = LruTtlCache(DEFAULT_FETCH_CACHE_MAX_ITEMS, DEFAULT_FETCH_CACHE_MAX_BYTES)
+_EXPORT_CACHE = LruTtlCache(DEFAULT_EXPORT_CACHE_MAX_ITEMS, DEFAULT_EXPORT_CACHE_MAX_BYTES)
+
+
+def _normalize_custom_assets(custom_assets: list[dict[str, str]] | None) -> list[dict[str, str]]:
+    normalized_custom = [
+        {
+            "label": str(row.get("label", "")).strip(),
+            "source": str(row.get("source", "")).strip().lower(),
+            "symbol": str(row.get("symbol", "")).strip(),
+        }
+        for row in (custom_assets or [])
+    ]
+    normalized_custom.sort(key=lambda row: (row["label"], row["source"], row["symbol"]))
+    return normalized_custom
+
+
+def _fred_key_fingerprint(fred_key: str) -> str:
+    return hashlib.sha256(fred_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _digest(payload: dict[str, Any]) -> str:
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
 def build_fetch_cache_key(
@@ -47,17 +303,8 @@ def build_fetch_cache_key(
     inverted_assets: list[str],
     custom_assets: list[dict[str, str]] | None,
     fred_key: str,
+    wire_format: str = "records",
 ) -> str:
-    normalized_custom = [
-        {
-            "label": str(row.get("label", "")).strip(),
-            "source": str(row.get("source", "")).strip().lower(),
-            "symbol": str(row.get("symbol", "")).strip(),
-        }
-        for row in (custom_assets or [])
-    ]
-    normalized_custom.sort(key=lambda row: (row["label"], row["source"], row["symbol"]))
-
     payload = {
         "v": 1,
         "market": market,
@@ -70,36 +317,139 @@ def build_fetch_cache_key(
         "included_assets": list(included_assets),
         "invert_global": bool(invert_global),
         "inverted_assets": sorted(set(inverted_assets)),
-        "custom_assets": normalized_custom,
-        "fred_key_fingerprint": hashlib.sha256(fred_key.encode("utf-8")).hexdigest()[:16],
+        "custom_assets": _normalize_custom_assets(custom_assets),
+        "fred_key_fingerprint": _fred_key_fingerprint(fred_key),
+        "format": wire_format,
     }
+    return _digest(payload)
+
+
+def build_frames_cache_key(
+    *,
+    market: str,
+    start_date: str,
+    end_date: str,
+    effective_freq: str,
+    assets: list[str],
+    custom_assets: list[dict[str, str]] | None,
+    fred_key: str,
+) -> str:
+    return _digest(
+        {
+            "v": 1,
+            "market": market,
+            "start_date": start_date,
+            "end_date": end_date,
+            "effective_freq": effective_freq,
+            "assets": list(assets),
+            "custom_assets": _normalize_custom_assets(custom_assets),
+            "fred_key_fingerprint": _fred_key_fingerprint(fred_key),
+        }
+    )
+
+
+def build_export_cache_key(
+    *,
+    frames_key: str,
+    frames: FetchFrames,
+    included_assets: list[str],
+    invert_global: bool,
+    inverted_assets: list[str],
+    file_format: str,
+) -> str:
+    return _digest(
+        {
+            "v": 1,
+            "frames_key": frames_key,
+            "data_version": repr(frames.created_at),
+            "included_assets": list(included_assets),
+            "invert_global": bool(invert_global),
+            "inverted_assets": sorted(set(inverted_assets)),
+            "format": file_format,
+        }
+    )
+
+
+def cache_age(entry: CachedPayload) -> float:
+    return max(0.0, _now() - entry.created_at)
 
-    raw = json.dumps(payload, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
-    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
+def get_fetch_cache(cache_key: str) -> CachedPayload | None:
+    entry = _FETCH_CACHE.get(cache_key)
+    if entry is None or cache_age(entry) >= DEFAULT_FETCH_CACHE_TTL:
+        return None
+    return entry
 
-def get_fetch_cache(cache_key: str) -> dict[str, Any] | None:
-    now = _now()
-    with _CACHE_LOCK:
-        _prune_expired(now)
-        hit = _FETCH_CACHE.get(cache_key)
-        if not hit:
-            return None
-        expiry, payload = hit
-        if expiry <= now:
-            _FETCH_CACHE.pop(cache_key, None)
-            return None
-        return copy.deepcopy(payload)
 
+def get_stale_fetch_cache(cache_key: str) -> CachedPayload | None:
+    return _FETCH_CACHE.get(cache_key)
 
-def set_fetch_cache(cache_key: str, payload: dict[str, Any], ttl_seconds: int = DEFAULT_FETCH_CACHE_TTL) -> None:
-    expiry = _now() + max(1, int(ttl_seconds))
-    with _CACHE_LOCK:
-        _prune_expired(_now())
-        _FETCH_CACHE[cache_key] = (expiry, copy.deepcopy(payload))
-        _enforce_max_size()
+
+def mark_stale(entry: CachedPayload) -> CachedPayload:
+    age = int(cache_age(entry))
+    flags = b'"stale":true,"age_seconds":' + str(age).encode("ascii")
+    prefix = b'{"meta":{'
+    if entry.body.startswith(prefix):
+        # Payloads always lead with "meta", so the flags are spliced in without re-serializing.
+        rest = entry.body[len(prefix):]
+        body = prefix + flags + (b"" if rest.startswith(b"}") else b",") + rest
+    else:
+        payload = json.loads(entry.body)
+        payload.setdefault("meta", {}).update(stale=True, age_seconds=age)
+        body = serialize_payload(payload)
+    meta = MappingProxyType({**entry.meta, "stale": True, "age_seconds": age})
+    return entry._replace(body=body, meta=meta)
+
+
+def set_fetch_cache(
+    cache_key: str,
+    payload: dict[str, Any] | CachedPayload,
+    ttl_seconds: int = DEFAULT_FETCH_CACHE_TTL,
+) -> CachedPayload:
+    entry = payload if isinstance(payload, CachedPayload) else freeze_payload(payload)
+    _FETCH_CACHE.set(cache_key, entry, ttl_seconds + max(0, DEFAULT_FETCH_CACHE_MAX_STALE))
+    return entry
 
 
 def clear_fetch_cache() -> None:
-    with _CACHE_LOCK:
-        _FETCH_CACHE.clear()
+    _FETCH_CACHE.clear()
+    _FRAMES_CACHE.clear()
+    _EXPORT_CACHE.clear()
+
+
+def get_frames_cache(frames_key: str) -> FetchFrames | None:
+    return _FRAMES_CACHE.get(frames_key)
+
+
+def set_frames_cache(
+    frames_key: str,
+    results: tuple[Any, Any, list[str], dict[str, str]],
+    ttl_seconds: int = DEFAULT_FETCH_CACHE_TTL,
+) -> FetchFrames:
+    frames = FetchFrames(*results, created_at=_now())
+    _FRAMES_CACHE.set(frames_key, frames, ttl_seconds)
+    return frames
+
+
+def get_export_cache(export_key: str) -> bytes | None:
+    return _EXPORT_CACHE.get(export_key)
+
+
+def set_export_cache(export_key: str, content: bytes, ttl_seconds: int = DEFAULT_FETCH_CACHE_TTL) -> None:
+    _EXPORT_CACHE.set(export_key, content, ttl_seconds)
+
+
+def build_series_cache_key(source: str, symbol: str, start: str, end: str, freq: str) -> SeriesCacheKey:
+    return (str(source).strip().lower(), str(symbol).strip(), start, end, freq)
+
+
+def get_series_cache(cache_key: SeriesCacheKey) -> Any | None:
+    return _SERIES_CACHE.get(cache_key)
+
+
+def set_series_cache(cache_key: SeriesCacheKey, value: Any, ttl_seconds: int = DEFAULT_SERIES_CACHE_TTL) -> None:
+    _SERIES_CACHE.set(cache_key, value, ttl_seconds)
+
+
+def clear_series_cache() -> None:
+    _SERIES_CACHE.clear()
@@ -0,0 +1,76 @@
+import os
+import threading
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .provider_guard import PROVIDER_FAILURE_STATUSES, guarded_call
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT_SECONDS", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF_SECONDS", "0.3"))
+
+Timeout = float | tuple[float, float]
+
+_SESSIONS_LOCK = threading.Lock()
+_SESSIONS: dict[str, requests.Session] = {}
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        read=HTTP_RETRIES,
+        status=HTTP_RETRIES,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        # 429 is left to the provider guard, which throttles instead of retrying harder.
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, HTTP_POOL_SIZE), max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(provider: str) -> requests.Session:
+    # One keep-alive pool per provider host, shared by every worker thread.
+    session = _SESSIONS.get(provider)
+    if session is not None:
+        return session
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(provider)
+        if session is None:
+            session = _build_session()
+            _SESSIONS[provider] = session
+        return session
+
+
+def provider_get(
+    provider: str,
+    url: str,
+    *,
+    params: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+    timeout: Timeout | None = None,
+) -> requests.Response:
+    effective_timeout = timeout if timeout is not None else (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    return guarded_call(
+        provider,
+        lambda: get_session(provider).get(url, params=params, headers=headers, timeout=effective_timeout),
+        is_failure=lambda response: response.status_code in PROVIDER_FAILURE_STATUSES,
+    )
+
+
+def close_sessions() -> None:
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
@@ -1,13 +1,27 @@
+import asyncio
 import io
+import json
+import os
+import threading
 import time
-from datetime import date
-from typing import Any, Callable, Literal
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import asynccontextmanager, contextmanager
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Literal
 
 import numpy as np
 import pandas as pd
-import requests
 import yfinance as yf
 from dateutil.relativedelta import relativedelta
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only the Arrow/Parquet export needs it
+    pa = None
+    pq = None
 
 from ..config import (
     ASSETS_INDICES_ETFS,
@@ -19,15 +33,57 @@ from ..config import (
     DEFAULT_START,
     MarketCode,
 )
+from .fetch_cache import (
+    LruTtlCache,
+    SeriesCacheKey,
+    build_series_cache_key,
+    get_series_cache,
+    set_series_cache,
+)
+from .async_clients import loop_local, provider_get_async
+from .currency_memo import get_currency_winner, remember_currency_winner
+from .failure_backoff import cooldown_until, is_meaningful_miss, record_failure, record_success
+from .http_clients import provider_get
+from .provider_guard import ProviderUnavailable, guarded_call
+from .series_store import load_ohlc, load_ohlc_async, pending_ranges
+from .single_flight import AsyncSingleFlight, SingleFlight
+from .source_slots import SourceSemaphore
 
 AssetSource = Literal["fred", "yahoo", "stooq"]
 AssetMeta = dict[str, str]
 AssetMap = dict[str, AssetMeta]
 ProgressHook = Callable[[int, int, str, str], None]
+# Series cache slot for the unresampled OHLC of a window; every frequency is derived from it.
+BASE_SERIES_FREQ = "raw"
+# Frames pre-downloaded in one multi-ticker request, keyed by (symbol, start, end).
+YahooBatch = dict[tuple[str, str, str], pd.DataFrame]
 
 SUPPORTED_CUSTOM_SOURCES: set[str] = {"fred", "yahoo", "stooq"}
 YAHOO_SEARCH_URL = "https://query1.finance.yahoo.com/v1/finance/search"
 FRED_SEARCH_URL = "https://api.stlouisfed.org/fred/series/search"
+EXCEL_DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+# Detail's 52-week range looks this many calendar days back from the latest close.
+WEEK_52_DAYS = 370
+WEEK_52_SERIES_FREQ = "52w"
+HISTORY_FIELDS = ("open", "high", "low", "close")
+# "columnar" ships detail history as one date array plus one array per OHLC field.
+HistoryFormat = Literal["records", "columnar"]
+
+DEFAULT_FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+SOURCE_CONCURRENCY_LIMITS: dict[str, int] = {
+    "fred": int(os.getenv("FETCH_FRED_CONCURRENCY", "4")),
+    "stooq": int(os.getenv("FETCH_STOOQ_CONCURRENCY", "3")),
+    "yahoo": int(os.getenv("FETCH_YAHOO_CONCURRENCY", "4")),
+}
+
+_SERIES_FLIGHTS = SingleFlight()
+# Losing async FX probes keep their Yahoo slot until their download ends; hold them here meanwhile.
+_PROBE_TASKS: set[asyncio.Task] = set()
+
+# Process-wide slots so concurrent requests, sync exports and async loads alike, share the per-provider caps.
+_SOURCE_SEMAPHORES: dict[str, SourceSemaphore] = {
+    source: SourceSemaphore(limit) for source, limit in SOURCE_CONCURRENCY_LIMITS.items()
+}
 
 
 def dates_from_preset(preset: str, ref: date) -> tuple[date, date]:
@@ -141,22 +197,31 @@ def list_market_instruments(market: MarketCode, custom_assets: list[dict[str, st
     return list(CURRENCY_PAIRS)
 
 
-def fetch_fred_close(series_id: str, start: str, end: str, api_key: str) -> pd.Series:
-    if not api_key:
-        return pd.Series(dtype=float)
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+STOOQ_DAILY_URL = "https://stooq.com/q/d/l/"
+# When the remembered FX ticker fails, probe the remaining candidates concurrently
+# instead of paying each candidate's retry sleeps one after another.
+CURRENCY_PARALLEL_PROBE = os.getenv("CURRENCY_PARALLEL_PROBE", "1").strip().lower() not in {"0", "false", "no"}
+STOOQ_FRAME_CACHE_TTL_SECONDS = int(os.getenv("STOOQ_FRAME_CACHE_TTL_SECONDS", "900"))
+STOOQ_FRAME_CACHE_MAX_ITEMS = int(os.getenv("STOOQ_FRAME_CACHE_MAX_ITEMS", "64"))
 
-    url = "https://api.stlouisfed.org/fred/series/observations"
-    params = {
+# Parsed Stooq downloads per symbol: (start, end, frame). Repeated refreshes inside the
+# TTL slice this frame instead of downloading and re-parsing the CSV.
+_STOOQ_FRAMES = LruTtlCache(STOOQ_FRAME_CACHE_MAX_ITEMS, 64 * 1024 * 1024)
+
+
+def _fred_params(series_id: str, start: str, end: str, api_key: str) -> dict[str, str]:
+    return {
         "series_id": series_id,
         "api_key": api_key,
         "file_type": "json",
         "observation_start": start,
         "observation_end": end,
     }
-    response = requests.get(url, params=params, timeout=30)
-    response.raise_for_status()
 
-    observations = response.json().get("observations", [])
+
+def _parse_fred_observations(payload: dict[str, Any]) -> pd.Series:
+    observations = payload.get("observations", [])
     data = {
         item["date"]: _as_float(item["value"])
         for item in observations
@@ -170,12 +235,8 @@ def fetch_fred_close(series_id: str, start: str, end: str, api_key: str) -> pd.S
     return series.dropna().sort_index()
 
 
-def fetch_stooq_ohlc(symbol: str) -> pd.DataFrame:
-    url = "https://stooq.com/q/d/l/"
-    response = requests.get(url, params={"s": symbol, "i": "d"}, timeout=30)
-    response.raise_for_status()
-
-    df = pd.read_csv(io.StringIO(response.text))
+def _parse_stooq_csv(text: str) -> pd.DataFrame:
+    df = pd.read_csv(io.StringIO(text))
     needed = ["Date", "Open", "High", "Low", "Close"]
     if df.empty or not all(col in df.columns for col in needed):
         return _empty_ohlc_frame()
@@ -200,52 +261,177 @@ def fetch_stooq_ohlc(symbol: str) -> pd.DataFrame:
     return ohlc.dropna(how="all")
 
 
-def fetch_yahoo_ohlc(symbol: str, start: str, end: str, retries: int = 3) -> pd.DataFrame:
-    last_error: Exception | None = None
+def fetch_fred_close(series_id: str, start: str, end: str, api_key: str) -> pd.Series:
+    if not api_key:
+        return pd.Series(dtype=float)
+
+    response = provider_get("fred", FRED_OBSERVATIONS_URL, params=_fred_params(series_id, start, end, api_key))
+    response.raise_for_status()
+    return _parse_fred_observations(response.json())
+
+
+async def fetch_fred_close_async(series_id: str, start: str, end: str, api_key: str) -> pd.Series:
+    if not api_key:
+        return pd.Series(dtype=float)
+
+    response = await provider_get_async(
+        "fred",
+        FRED_OBSERVATIONS_URL,
+        params=_fred_params(series_id, start, end, api_key),
+    )
+    response.raise_for_status()
+    return await asyncio.to_thread(_parse_fred_observations, response.json())
 
+
+def _stooq_params(symbol: str, start: str | None, end: str | None) -> dict[str, str]:
+    params = {"s": symbol, "i": "d"}
+    if start:
+        params["d1"] = start.replace("-", "")
+    if end:
+        params["d2"] = end.replace("-", "")
+    return params
+
+
+def _cached_stooq_frame(symbol: str, start: str | None, end: str | None) -> pd.DataFrame | None:
+    cached = _STOOQ_FRAMES.get(symbol)
+    if cached is None:
+        return None
+    cached_start, cached_end, frame = cached
+    if cached_start is not None and (start is None or start < cached_start):
+        return None
+    if cached_end is not None and (end is None or end > cached_end):
+        return None
+    return frame.loc[start:end]
+
+
+def _store_stooq_frame(symbol: str, start: str | None, end: str | None, frame: pd.DataFrame) -> pd.DataFrame:
+    if not frame.empty:
+        _STOOQ_FRAMES.set(symbol, (start, end, frame), STOOQ_FRAME_CACHE_TTL_SECONDS)
+    return frame
+
+
+def clear_stooq_frames() -> None:
+    _STOOQ_FRAMES.clear()
+
+
+def fetch_stooq_ohlc(symbol: str, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+    cached = _cached_stooq_frame(symbol, start, end)
+    if cached is not None:
+        return cached
+
+    response = provider_get("stooq", STOOQ_DAILY_URL, params=_stooq_params(symbol, start, end))
+    response.raise_for_status()
+    return _store_stooq_frame(symbol, start, end, _parse_stooq_csv(response.text))
+
+
+async def fetch_stooq_ohlc_async(symbol: str, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+    cached = _cached_stooq_frame(symbol, start, end)
+    if cached is not None:
+        return cached
+
+    response = await provider_get_async("stooq", STOOQ_DAILY_URL, params=_stooq_params(symbol, start, end))
+    response.raise_for_status()
+    # Parsing a full-history CSV takes long enough to stall other requests on the loop.
+    frame = await asyncio.to_thread(_parse_stooq_csv, response.text)
+    return _store_stooq_frame(symbol, start, end, frame)
+
+
+def _normalize_yahoo_frame(df: pd.DataFrame) -> pd.DataFrame:
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return _empty_ohlc_frame()
+
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = [col[0] for col in df.columns]
+
+    out = pd.DataFrame(index=pd.to_datetime(df.index))
+    out["open"] = pd.to_numeric(df.get("Open"), errors="coerce")
+    out["high"] = pd.to_numeric(df.get("High"), errors="coerce")
+    out["low"] = pd.to_numeric(df.get("Low"), errors="coerce")
+
+    if "Adj Close" in df.columns:
+        out["close"] = pd.to_numeric(df.get("Adj Close"), errors="coerce")
+    else:
+        out["close"] = pd.to_numeric(df.get("Close"), errors="coerce")
+
+    out = out.sort_index().dropna(how="all")
+    if out.empty:
+        return _empty_ohlc_frame()
+
+    for col in ["open", "high", "low"]:
+        out[col] = out[col].fillna(out["close"])
+
+    return out[["open", "high", "low", "close"]]
+
+
+def fetch_yahoo_ohlc(symbol: str, start: str, end: str, retries: int = 3) -> pd.DataFrame:
     for attempt in range(retries):
         try:
-            df = yf.download(
-                symbol,
-                start=start,
-                end=end,
-                progress=False,
-                auto_adjust=False,
-                threads=False,
+            df = guarded_call(
+                "yahoo",
+                lambda: yf.download(
+                    symbol,
+                    start=start,
+                    end=end,
+                    progress=False,
+                    auto_adjust=False,
+                    threads=False,
+                ),
             )
-            if not isinstance(df, pd.DataFrame) or df.empty:
-                time.sleep(0.7 * (attempt + 1))
-                continue
+            out = _normalize_yahoo_frame(df)
+            if not out.empty:
+                return out
+        except ProviderUnavailable:
+            # Throttled or open circuit: surface it so callers don't mistake it for "no data".
+            raise
+        except Exception:
+            pass
+        time.sleep(0.7 * (attempt + 1))
 
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = [col[0] for col in df.columns]
+    return _empty_ohlc_frame()
 
-            out = pd.DataFrame(index=pd.to_datetime(df.index))
-            out["open"] = pd.to_numeric(df.get("Open"), errors="coerce")
-            out["high"] = pd.to_numeric(df.get("High"), errors="coerce")
-            out["low"] = pd.to_numeric(df.get("Low"), errors="coerce")
 
-            if "Adj Close" in df.columns:
-                out["close"] = pd.to_numeric(df.get("Adj Close"), errors="coerce")
-            else:
-                out["close"] = pd.to_numeric(df.get("Close"), errors="coerce")
+def _split_yahoo_batch(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    if not isinstance(df, pd.DataFrame) or df.empty or not isinstance(df.columns, pd.MultiIndex):
+        return _empty_ohlc_frame()
+    for level in range(df.columns.nlevels):
+        if symbol in df.columns.get_level_values(level):
+            return _normalize_yahoo_frame(df.xs(symbol, axis=1, level=level))
+    return _empty_ohlc_frame()
 
-            out = out.sort_index().dropna(how="all")
-            if out.empty:
-                time.sleep(0.7 * (attempt + 1))
-                continue
 
-            for col in ["open", "high", "low"]:
-                out[col] = out[col].fillna(out["close"])
+def fetch_yahoo_batch(symbols: list[str], start: str, end: str) -> dict[str, pd.DataFrame]:
+    # Returns only the tickers the batch delivered; the per-label workers fetch the rest in parallel.
+    unique = list(dict.fromkeys(symbols))
+    if len(unique) <= 1:
+        return {}
 
-            return out[["open", "high", "low", "close"]]
-        except Exception as exc:
-            last_error = exc
-            time.sleep(0.7 * (attempt + 1))
+    try:
+        # A batch with no rows for any ticker is treated as a provider failure (typically throttling).
+        df = guarded_call(
+            "yahoo",
+            lambda: yf.download(
+                unique,
+                start=start,
+                end=end,
+                progress=False,
+                auto_adjust=False,
+                group_by="ticker",
+                threads=True,
+            ),
+            is_failure=lambda result: not isinstance(result, pd.DataFrame) or result.empty,
+        )
+    except ProviderUnavailable:
+        raise
+    except Exception:
+        df = None
 
-    if last_error:
-        return _empty_ohlc_frame()
-    return _empty_ohlc_frame()
+    out: dict[str, pd.DataFrame] = {}
+    for symbol in unique:
+        frame = _split_yahoo_batch(df, symbol)
+        if not frame.empty:
+            out[symbol] = frame
+    return out
 
 
 def _display_label(name: str, symbol: str) -> str:
@@ -272,7 +458,7 @@ def search_fred_instruments(query: str, api_key: str, limit: int = 10) -> list[d
         "sort_order": "desc",
     }
     try:
-        response = requests.get(FRED_SEARCH_URL, params=params, timeout=6)
+        response = provider_get("fred", FRED_SEARCH_URL, params=params, timeout=6)
         response.raise_for_status()
         rows = response.json().get("seriess", [])
     except Exception:
@@ -312,7 +498,7 @@ def search_yahoo_instruments(query: str, limit: int = 10) -> list[dict[str, Any]
     }
     headers = {"User-Agent": "Mozilla/5.0"}
     try:
-        response = requests.get(YAHOO_SEARCH_URL, params=params, headers=headers, timeout=6)
+        response = provider_get("yahoo", YAHOO_SEARCH_URL, params=params, headers=headers, timeout=6)
         response.raise_for_status()
         rows = response.json().get("quotes", [])
     except Exception:
@@ -401,9 +587,9 @@ def _invert_ohlc(frame: pd.DataFrame) -> pd.DataFrame:
     return out.dropna(how="all")
 
 
-def _apply_frequency(frame: pd.DataFrame, freq: str) -> pd.DataFrame:
+def _apply_frequency(frame: pd.DataFrame, freq: str | None) -> pd.DataFrame:
     frame = frame.sort_index()
-    if frame.empty:
+    if frame.empty or freq is None:
         return frame
 
     if freq in {"D", "B"}:
@@ -438,6 +624,24 @@ def _apply_frequency(frame: pd.DataFrame, freq: str) -> pd.DataFrame:
     return out[out["close"].notna()]
 
 
+def _close_to_ohlc(close: pd.Series) -> pd.DataFrame:
+    if close.empty:
+        return _empty_ohlc_frame()
+    frame = pd.DataFrame({"close": close})
+    frame["open"] = frame["close"]
+    frame["high"] = frame["close"]
+    frame["low"] = frame["close"]
+    return frame[["open", "high", "low", "close"]]
+
+
+def _fred_ohlc(series_id: str, start: str, end: str, api_key: str) -> pd.DataFrame:
+    return _close_to_ohlc(fetch_fred_close(series_id, start, end, api_key))
+
+
+async def _fred_ohlc_async(series_id: str, start: str, end: str, api_key: str) -> pd.DataFrame:
+    return _close_to_ohlc(await fetch_fred_close_async(series_id, start, end, api_key))
+
+
 def _slice_dates(frame: pd.DataFrame, start: str, end: str) -> pd.DataFrame:
     if frame.empty:
         return frame
@@ -446,13 +650,35 @@ def _slice_dates(frame: pd.DataFrame, start: str, end: str) -> pd.DataFrame:
     return frame.loc[(frame.index >= start_dt) & (frame.index <= end_dt)]
 
 
+def _yahoo_fetcher(symbol: str, yahoo_batch: YahooBatch | None) -> Callable[[str, str], pd.DataFrame]:
+    def fetch(start: str, end: str) -> pd.DataFrame:
+        prefetched = (yahoo_batch or {}).get((symbol, start, end))
+        if prefetched is not None:
+            return prefetched
+        return fetch_yahoo_ohlc(symbol, start, end)
+
+    return fetch
+
+
+def _yahoo_fetcher_async(symbol: str, yahoo_batch: YahooBatch | None) -> Callable[[str, str], Awaitable[pd.DataFrame]]:
+    async def fetch(start: str, end: str) -> pd.DataFrame:
+        prefetched = (yahoo_batch or {}).get((symbol, start, end))
+        if prefetched is not None:
+            return prefetched
+        # yfinance has no async API; it runs in a thread bounded by the Yahoo semaphore.
+        return await asyncio.to_thread(fetch_yahoo_ohlc, symbol, start, end)
+
+    return fetch
+
+
 def get_indices_frame(
     label: str,
     start: str,
     end: str,
-    freq: str,
+    freq: str | None,
     fred_key: str,
     asset_map: AssetMap | None = None,
+    yahoo_batch: YahooBatch | None = None,
 ) -> tuple[pd.DataFrame, str]:
     effective_map = asset_map or build_indices_asset_map()
     meta = effective_map.get(label)
@@ -463,49 +689,279 @@ def get_indices_frame(
     symbol = meta["id"]
 
     if src == "fred":
-        close = fetch_fred_close(symbol, start, end, fred_key)
-        if close.empty:
-            return _empty_ohlc_frame(), symbol
-        frame = pd.DataFrame({"close": close})
-        frame["open"] = frame["close"]
-        frame["high"] = frame["close"]
-        frame["low"] = frame["close"]
-        frame = frame[["open", "high", "low", "close"]]
+        frame = load_ohlc(src, symbol, start, end, lambda s, e: _fred_ohlc(symbol, s, e, fred_key))
+    elif src == "stooq":
+        frame = load_ohlc(src, symbol, start, end, lambda s, e: fetch_stooq_ohlc(symbol, s, e))
+    elif src == "yahoo":
+        frame = load_ohlc(src, symbol, start, end, _yahoo_fetcher(symbol, yahoo_batch))
+    else:
+        return _empty_ohlc_frame(), symbol
+
+    if frame.empty:
+        return _empty_ohlc_frame(), symbol
+
+    frame = _slice_dates(frame, start, end)
+    frame = _apply_frequency(frame, freq)
+    return frame, symbol
+
+
+async def get_indices_frame_async(
+    label: str,
+    start: str,
+    end: str,
+    freq: str | None,
+    fred_key: str,
+    asset_map: AssetMap | None = None,
+    yahoo_batch: YahooBatch | None = None,
+) -> tuple[pd.DataFrame, str]:
+    effective_map = asset_map or build_indices_asset_map()
+    meta = effective_map.get(label)
+    if meta is None:
+        return _empty_ohlc_frame(), ""
+
+    src = meta["src"]
+    symbol = meta["id"]
+
+    if src == "fred":
+        frame = await load_ohlc_async(src, symbol, start, end, lambda s, e: _fred_ohlc_async(symbol, s, e, fred_key))
     elif src == "stooq":
-        frame = fetch_stooq_ohlc(symbol)
+        frame = await load_ohlc_async(src, symbol, start, end, lambda s, e: fetch_stooq_ohlc_async(symbol, s, e))
     elif src == "yahoo":
-        frame = fetch_yahoo_ohlc(symbol, start, end)
+        frame = await load_ohlc_async(src, symbol, start, end, _yahoo_fetcher_async(symbol, yahoo_batch))
     else:
         return _empty_ohlc_frame(), symbol
 
+    if frame.empty:
+        return _empty_ohlc_frame(), symbol
+
     frame = _slice_dates(frame, start, end)
     frame = _apply_frequency(frame, freq)
     return frame, symbol
 
 
-def get_currency_frame(pair: str, start: str, end: str, freq: str) -> tuple[pd.DataFrame, str]:
+def _currency_candidate_frame(
+    frame: pd.DataFrame,
+    invert: bool,
+    start: str,
+    end: str,
+    freq: str | None,
+) -> pd.DataFrame:
+    if frame.empty:
+        return frame
+    if invert:
+        frame = _invert_ohlc(frame)
+    frame = _slice_dates(frame, start, end)
+    return _apply_frequency(frame, freq)
+
+
+def _ordered_currency_candidates(pair: str) -> list[tuple[str, bool]]:
     candidates = CURRENCY_CANDIDATES.get(pair, [])
+    winner = get_currency_winner(pair)
+    # Stable sort: the remembered winner goes first, the rest keep their configured order.
+    return sorted(candidates, key=lambda candidate: candidate[0] != winner)
+
+
+def get_currency_frame(
+    pair: str,
+    start: str,
+    end: str,
+    freq: str | None,
+    yahoo_batch: YahooBatch | None = None,
+) -> tuple[pd.DataFrame, str]:
+    candidates = _ordered_currency_candidates(pair)
     if not candidates:
         return _empty_ohlc_frame(), ""
 
-    for ticker, invert in candidates:
-        frame = fetch_yahoo_ohlc(ticker, start, end)
-        if frame.empty:
-            continue
+    resolved = threading.Event()
+
+    def probe(candidate: tuple[str, bool]) -> tuple[pd.DataFrame, str]:
+        ticker, invert = candidate
+        # Each probe takes its own Yahoo slot, so parallel candidates respect FETCH_YAHOO_CONCURRENCY.
+        with _source_slot("yahoo"):
+            if resolved.is_set():
+                return _empty_ohlc_frame(), ticker
+            frame = load_ohlc("yahoo", ticker, start, end, _yahoo_fetcher(ticker, yahoo_batch))
+        return _currency_candidate_frame(frame, invert, start, end, freq), ticker
+
+    leading = candidates[:1] if CURRENCY_PARALLEL_PROBE else candidates
+    for candidate in leading:
+        frame, ticker = probe(candidate)
+        if not frame.empty:
+            remember_currency_winner(pair, ticker)
+            return frame, ticker
+
+    remaining = candidates[len(leading):]
+    if not remaining:
+        return _empty_ohlc_frame(), ""
+
+    executor = ThreadPoolExecutor(max_workers=len(remaining))
+    try:
+        for future in as_completed([executor.submit(probe, candidate) for candidate in remaining]):
+            frame, ticker = future.result()
+            if not frame.empty:
+                remember_currency_winner(pair, ticker)
+                return frame, ticker
+    finally:
+        # Queued losers return as soon as they get a slot; running ones finish inside theirs.
+        resolved.set()
+        executor.shutdown(wait=False, cancel_futures=True)
 
-        if invert:
-            frame = _invert_ohlc(frame)
+    return _empty_ohlc_frame(), ""
 
-        frame = _slice_dates(frame, start, end)
-        frame = _apply_frequency(frame, freq)
-        if frame.empty:
-            continue
 
-        return frame, ticker
+async def get_currency_frame_async(
+    pair: str,
+    start: str,
+    end: str,
+    freq: str | None,
+    yahoo_batch: YahooBatch | None = None,
+) -> tuple[pd.DataFrame, str]:
+    candidates = _ordered_currency_candidates(pair)
+    if not candidates:
+        return _empty_ohlc_frame(), ""
+
+    resolved = asyncio.Event()
+
+    async def probe(candidate: tuple[str, bool]) -> tuple[pd.DataFrame, str]:
+        ticker, invert = candidate
+        async with _source_slot_async("yahoo"):
+            if resolved.is_set():
+                return _empty_ohlc_frame(), ticker
+            frame = await load_ohlc_async("yahoo", ticker, start, end, _yahoo_fetcher_async(ticker, yahoo_batch))
+        return _currency_candidate_frame(frame, invert, start, end, freq), ticker
+
+    leading = candidates[:1] if CURRENCY_PARALLEL_PROBE else candidates
+    for candidate in leading:
+        frame, ticker = await probe(candidate)
+        if not frame.empty:
+            remember_currency_winner(pair, ticker)
+            return frame, ticker
+
+    tasks = [asyncio.create_task(probe(candidate)) for candidate in candidates[len(leading):]]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            frame, ticker = await next_done
+            if not frame.empty:
+                remember_currency_winner(pair, ticker)
+                return frame, ticker
+    finally:
+        # Cancelling would free the slot while yfinance keeps running in its thread, so losers are
+        # left to finish (queued ones bail out once they get a slot).
+        resolved.set()
+        for task in tasks:
+            if not task.done():
+                _PROBE_TASKS.add(task)
+                task.add_done_callback(_PROBE_TASKS.discard)
+                task.add_done_callback(lambda done: done.cancelled() or done.exception())
 
     return _empty_ohlc_frame(), ""
 
 
+def _asset_identity(market: MarketCode, instrument: str, indices_asset_map: AssetMap | None) -> tuple[str, str]:
+    if market == "indices_etfs":
+        meta = (indices_asset_map or build_indices_asset_map()).get(instrument, {})
+        return meta.get("src", ""), meta.get("id", instrument)
+    return "yahoo_fx", instrument
+
+
+def _series_cache_key_for(
+    market: MarketCode,
+    instrument: str,
+    start: str,
+    end: str,
+    freq: str,
+    indices_asset_map: AssetMap | None,
+) -> tuple[str, str, str, str, str]:
+    return build_series_cache_key(*_asset_identity(market, instrument, indices_asset_map), start, end, freq)
+
+
+def asset_cooldowns(
+    market: MarketCode,
+    labels: list[str],
+    custom_assets: list[dict[str, str]] | None = None,
+) -> dict[str, float]:
+    indices_asset_map = build_indices_asset_map(custom_assets) if market == "indices_etfs" else None
+    cooldowns: dict[str, float] = {}
+    for label in labels:
+        until = cooldown_until(*_asset_identity(market, label, indices_asset_map))
+        if until is not None:
+            cooldowns[label] = until
+    return cooldowns
+
+
+def _base_frame(
+    market: MarketCode,
+    instrument: str,
+    start: str,
+    end: str,
+    fred_key: str,
+    indices_asset_map: AssetMap | None,
+    yahoo_batch: YahooBatch | None,
+) -> tuple[pd.DataFrame, str]:
+    cache_key = _series_cache_key_for(market, instrument, start, end, BASE_SERIES_FREQ, indices_asset_map)
+    cached = get_series_cache(cache_key)
+    if cached is not None:
+        return cached
+
+    def load(_publish: Callable[..., None]) -> tuple[pd.DataFrame, str]:
+        if market == "indices_etfs":
+            frame, symbol = get_indices_frame(
+                instrument, start, end, None, fred_key, indices_asset_map, yahoo_batch=yahoo_batch
+            )
+        else:
+            frame, symbol = get_currency_frame(instrument, start, end, None, yahoo_batch=yahoo_batch)
+        if not frame.empty:
+            set_series_cache(cache_key, (frame, symbol))
+        return frame, symbol
+
+    # Concurrent requests for the same series share one provider round-trip.
+    result, _ = _SERIES_FLIGHTS.run(cache_key, load)
+    return result
+
+
+async def _base_frame_async(
+    market: MarketCode,
+    instrument: str,
+    start: str,
+    end: str,
+    fred_key: str,
+    indices_asset_map: AssetMap | None,
+    yahoo_batch: YahooBatch | None,
+) -> tuple[pd.DataFrame, str]:
+    cache_key = _series_cache_key_for(market, instrument, start, end, BASE_SERIES_FREQ, indices_asset_map)
+    cached = get_series_cache(cache_key)
+    if cached is not None:
+        return cached
+
+    async def load(_publish: Callable[..., None]) -> tuple[pd.DataFrame, str]:
+        if market == "indices_etfs":
+            frame, symbol = await get_indices_frame_async(
+                instrument, start, end, None, fred_key, indices_asset_map, yahoo_batch=yahoo_batch
+            )
+        else:
+            frame, symbol = await get_currency_frame_async(instrument, start, end, None, yahoo_batch=yahoo_batch)
+        if not frame.empty:
+            set_series_cache(cache_key, (frame, symbol))
+        return frame, symbol
+
+    flights = loop_local("series_flights", AsyncSingleFlight)
+    result, _ = await flights.run(cache_key, load)
+    return result
+
+
+def _derive_frequency(
+    cache_key: SeriesCacheKey,
+    base: pd.DataFrame,
+    symbol: str,
+    freq: str,
+) -> tuple[pd.DataFrame, str]:
+    if base.empty:
+        return _empty_ohlc_frame(), symbol
+    frame = _apply_frequency(base, freq)
+    set_series_cache(cache_key, (frame, symbol))
+    return frame.copy(), symbol
+
+
 def get_asset_frame(
     market: MarketCode,
     instrument: str,
@@ -514,49 +970,127 @@ def get_asset_frame(
     freq: str,
     fred_key: str,
     indices_asset_map: AssetMap | None = None,
+    yahoo_batch: YahooBatch | None = None,
 ) -> tuple[pd.DataFrame, str]:
-    if market == "indices_etfs":
-        return get_indices_frame(instrument, start, end, freq, fred_key, indices_asset_map)
-    return get_currency_frame(instrument, start, end, freq)
+    cache_key = _series_cache_key_for(market, instrument, start, end, freq, indices_asset_map)
+    cached = get_series_cache(cache_key)
+    if cached is not None:
+        frame, symbol = cached
+        return frame.copy(), symbol
 
+    # D/B/W/M views are all resampled locally from one cached base download per window.
+    base, symbol = _base_frame(market, instrument, start, end, fred_key, indices_asset_map, yahoo_batch)
+    return _derive_frequency(cache_key, base, symbol, freq)
 
-def fetch_all_assets(
+
+async def get_asset_frame_async(
     market: MarketCode,
-    labels: list[str],
+    instrument: str,
     start: str,
     end: str,
     freq: str,
     fred_key: str,
-    custom_assets: list[dict[str, str]] | None = None,
-    progress_hook: ProgressHook | None = None,
+    indices_asset_map: AssetMap | None = None,
+    yahoo_batch: YahooBatch | None = None,
+) -> tuple[pd.DataFrame, str]:
+    cache_key = _series_cache_key_for(market, instrument, start, end, freq, indices_asset_map)
+    cached = get_series_cache(cache_key)
+    if cached is not None:
+        frame, symbol = cached
+        return frame.copy(), symbol
+
+    base, symbol = await _base_frame_async(market, instrument, start, end, fred_key, indices_asset_map, yahoo_batch)
+    return await asyncio.to_thread(_derive_frequency, cache_key, base, symbol, freq)
+
+
+def _yahoo_batch_targets(
+    market: MarketCode,
+    labels: list[str],
+    indices_asset_map: AssetMap | None,
+) -> list[tuple[str, str]]:
+    if market == "indices_etfs":
+        return [
+            (label, meta["id"])
+            for label in labels
+            if (meta := (indices_asset_map or build_indices_asset_map()).get(label)) and meta["src"] == "yahoo"
+        ]
+    # FX pairs are batched on their leading (remembered) ticker; other candidates stay as fallbacks.
+    return [(pair, candidates[0][0]) for pair in labels if (candidates := _ordered_currency_candidates(pair))]
+
+
+def prefetch_yahoo_batch(
+    market: MarketCode,
+    labels: list[str],
+    start: str,
+    end: str,
+    indices_asset_map: AssetMap | None = None,
+) -> YahooBatch:
+    groups: dict[tuple[str, str], list[str]] = {}
+    for label, symbol in _yahoo_batch_targets(market, labels, indices_asset_map):
+        base_key = _series_cache_key_for(market, label, start, end, BASE_SERIES_FREQ, indices_asset_map)
+        if get_series_cache(base_key) is not None:
+            continue
+        if cooldown_until(*_asset_identity(market, label, indices_asset_map)) is not None:
+            continue
+        for window in pending_ranges("yahoo", symbol, start, end):
+            groups.setdefault(window, []).append(symbol)
+
+    batch: YahooBatch = {}
+    for (window_start, window_end), symbols in groups.items():
+        try:
+            fetched = fetch_yahoo_batch(symbols, window_start, window_end)
+        except ProviderUnavailable:
+            # The per-label workers hit the same guard and report the outage without cooling symbols down.
+            break
+        for symbol, frame in fetched.items():
+            batch[(symbol, window_start, window_end)] = frame
+    return batch
+
+
+@contextmanager
+def _source_slot(source: str) -> Iterator[None]:
+    semaphore = _SOURCE_SEMAPHORES.get(source)
+    if semaphore is None:
+        yield
+        return
+    with semaphore:
+        yield
+
+
+@asynccontextmanager
+async def _source_slot_async(source: str) -> AsyncIterator[None]:
+    # Same semaphores as _source_slot: exports and dashboard loads share one cap per provider.
+    semaphore = _SOURCE_SEMAPHORES.get(source)
+    if semaphore is None:
+        yield
+        return
+    async with semaphore:
+        yield
+
+
+def _asset_source(market: MarketCode, label: str, indices_asset_map: AssetMap | None) -> str:
+    if market == "indices_etfs":
+        return str((indices_asset_map or {}).get(label, {}).get("src", ""))
+    # FX pairs take Yahoo slots per candidate probe inside get_currency_frame, not per label.
+    return ""
+
+
+def _assemble_assets(
+    market: MarketCode,
+    labels: list[str],
+    results: list[tuple[pd.DataFrame, str]],
+    indices_asset_map: AssetMap | None,
 ) -> tuple[pd.DataFrame, pd.DataFrame, list[str], dict[str, str]]:
     series_map: dict[str, pd.Series] = {}
     snapshot_rows: list[dict[str, Any]] = []
     failures: list[str] = []
     resolved_symbols: dict[str, str] = {}
     source_map: dict[str, str] = {}
-    indices_asset_map = build_indices_asset_map(custom_assets) if market == "indices_etfs" else None
-
-    total = len(labels)
-    for index, label in enumerate(labels, start=1):
-        if progress_hook:
-            progress_hook(index - 1, total, label, "fetching")
-
-        frame, resolved_symbol = get_asset_frame(
-            market=market,
-            instrument=label,
-            start=start,
-            end=end,
-            freq=freq,
-            fred_key=fred_key,
-            indices_asset_map=indices_asset_map,
-        )
 
+    for label, (frame, resolved_symbol) in zip(labels, results):
         close = frame["close"].dropna() if "close" in frame.columns else pd.Series(dtype=float)
         if close.empty:
             failures.append(label)
-            if progress_hook:
-                progress_hook(index, total, label, "failed")
             continue
 
         resolved_symbols[label] = resolved_symbol
@@ -589,8 +1123,6 @@ def fetch_all_assets(
                 "Source": source_map.get(label, ""),
             }
         )
-        if progress_hook:
-            progress_hook(index, total, label, "loaded")
 
     if not series_map:
         return pd.DataFrame(), pd.DataFrame(), failures, resolved_symbols
@@ -603,6 +1135,139 @@ def fetch_all_assets(
     return base_df, snapshot_df, failures, resolved_symbols
 
 
+def fetch_all_assets(
+    market: MarketCode,
+    labels: list[str],
+    start: str,
+    end: str,
+    freq: str,
+    fred_key: str,
+    custom_assets: list[dict[str, str]] | None = None,
+    progress_hook: ProgressHook | None = None,
+    max_workers: int | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, list[str], dict[str, str]]:
+    indices_asset_map = build_indices_asset_map(custom_assets) if market == "indices_etfs" else None
+
+    with _source_slot("yahoo"):
+        yahoo_batch = prefetch_yahoo_batch(market, labels, start, end, indices_asset_map)
+
+    total = len(labels)
+    progress_lock = threading.Lock()
+    progress_state = {"completed": 0}
+
+    def load(label: str) -> tuple[pd.DataFrame, str]:
+        identity = _asset_identity(market, label, indices_asset_map)
+        if cooldown_until(*identity) is not None:
+            # Recently failing symbols are skipped until their backoff window ends.
+            with progress_lock:
+                progress_state["completed"] += 1
+                if progress_hook:
+                    progress_hook(progress_state["completed"], total, label, "skipped")
+            return _empty_ohlc_frame(), ""
+
+        if progress_hook:
+            with progress_lock:
+                progress_hook(progress_state["completed"], total, label, "fetching")
+
+        provider_down = False
+        with _source_slot(_asset_source(market, label, indices_asset_map)):
+            try:
+                frame, resolved_symbol = get_asset_frame(
+                    market=market,
+                    instrument=label,
+                    start=start,
+                    end=end,
+                    freq=freq,
+                    fred_key=fred_key,
+                    indices_asset_map=indices_asset_map,
+                    yahoo_batch=yahoo_batch,
+                )
+            except ProviderUnavailable:
+                frame, resolved_symbol, provider_down = _empty_ohlc_frame(), "", True
+
+        loaded = "close" in frame.columns and not frame["close"].dropna().empty
+        if loaded:
+            record_success(*identity)
+        elif not provider_down and is_meaningful_miss(start, end):
+            # Provider-wide outages are the circuit breaker's job, not a reason to cool the symbol down.
+            record_failure(*identity)
+        with progress_lock:
+            progress_state["completed"] += 1
+            if progress_hook:
+                progress_hook(progress_state["completed"], total, label, "loaded" if loaded else "failed")
+        return frame, resolved_symbol
+
+    workers = max(1, min(max_workers or DEFAULT_FETCH_MAX_WORKERS, total))
+    if workers == 1:
+        results = [load(label) for label in labels]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="finboard-fetch") as executor:
+            results = list(executor.map(load, labels))
+
+    return _assemble_assets(market, labels, results, indices_asset_map)
+
+
+async def fetch_all_assets_async(
+    market: MarketCode,
+    labels: list[str],
+    start: str,
+    end: str,
+    freq: str,
+    fred_key: str,
+    custom_assets: list[dict[str, str]] | None = None,
+    progress_hook: ProgressHook | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, list[str], dict[str, str]]:
+    indices_asset_map = build_indices_asset_map(custom_assets) if market == "indices_etfs" else None
+
+    async with _source_slot_async("yahoo"):
+        yahoo_batch = await asyncio.to_thread(
+            prefetch_yahoo_batch, market, labels, start, end, indices_asset_map
+        )
+
+    total = len(labels)
+    progress_state = {"completed": 0}
+
+    async def load(label: str) -> tuple[pd.DataFrame, str]:
+        identity = _asset_identity(market, label, indices_asset_map)
+        if cooldown_until(*identity) is not None:
+            progress_state["completed"] += 1
+            if progress_hook:
+                progress_hook(progress_state["completed"], total, label, "skipped")
+            return _empty_ohlc_frame(), ""
+
+        if progress_hook:
+            progress_hook(progress_state["completed"], total, label, "fetching")
+
+        provider_down = False
+        async with _source_slot_async(_asset_source(market, label, indices_asset_map)):
+            try:
+                frame, resolved_symbol = await get_asset_frame_async(
+                    market=market,
+                    instrument=label,
+                    start=start,
+                    end=end,
+                    freq=freq,
+                    fred_key=fred_key,
+                    indices_asset_map=indices_asset_map,
+                    yahoo_batch=yahoo_batch,
+                )
+            except ProviderUnavailable:
+                frame, resolved_symbol, provider_down = _empty_ohlc_frame(), "", True
+
+        loaded = "close" in frame.columns and not frame["close"].dropna().empty
+        if loaded:
+            record_success(*identity)
+        elif not provider_down and is_meaningful_miss(start, end):
+            record_failure(*identity)
+        progress_state["completed"] += 1
+        if progress_hook:
+            progress_hook(progress_state["completed"], total, label, "loaded" if loaded else "failed")
+        return frame, resolved_symbol
+
+    results = await asyncio.gather(*(load(label) for label in labels))
+    return await asyncio.to_thread(_assemble_assets, market, labels, list(results), indices_asset_map)
+
+
 def _effective_inversion(
     labels: list[str],
     invert_global: bool,
@@ -691,15 +1356,12 @@ def build_snapshot_view(
     return data
 
 
-def to_excel_bytes(
-    view_df: pd.DataFrame,
+def _export_asset_rows(
     included: list[str],
-    snapshot_df: pd.DataFrame,
-    meta: dict[str, Any],
     market: MarketCode,
     resolved_symbols: dict[str, str] | None = None,
     custom_assets: list[dict[str, str]] | None = None,
-) -> bytes:
+) -> list[dict[str, str]]:
     symbol_map = resolved_symbols or {}
     indices_asset_map = build_indices_asset_map(custom_assets) if market == "indices_etfs" else {}
 
@@ -722,32 +1384,152 @@ def to_excel_bytes(
                     "Simbolo": symbol_map.get(label, _currency_symbol(label)),
                 }
             )
+    return metadata_rows
 
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-        view_df.to_excel(writer, sheet_name="Datos")
-        pd.DataFrame(metadata_rows).to_excel(writer, sheet_name="Activos", index=False)
-        if not snapshot_df.empty:
-            snapshot_df.drop(columns=["PrevClose", "isInverted"], errors="ignore").to_excel(
-                writer,
-                sheet_name="Snapshot",
-                index=False,
-            )
-        pd.DataFrame(
-            [
-                {
-                    "mercado": market,
-                    "fecha_inicio": meta.get("sdate"),
-                    "fecha_fin": meta.get("edate"),
-                    "frecuencia": meta.get("freq"),
-                    "filas": int(view_df.shape[0]),
-                    "columnas": int(view_df.shape[1]),
-                }
-            ]
-        ).to_excel(writer, sheet_name="Info", index=False)
 
-    buffer.seek(0)
-    return buffer.getvalue()
+def _export_info_row(view_df: pd.DataFrame, meta: dict[str, Any], market: MarketCode) -> dict[str, Any]:
+    return {
+        "mercado": market,
+        "fecha_inicio": meta.get("sdate"),
+        "fecha_fin": meta.get("edate"),
+        "frecuencia": meta.get("freq"),
+        "filas": int(view_df.shape[0]),
+        "columnas": int(view_df.shape[1]),
+    }
+
+
+def _export_snapshot(snapshot_df: pd.DataFrame) -> pd.DataFrame:
+    return snapshot_df.drop(columns=["PrevClose", "isInverted"], errors="ignore")
+
+
+def _excel_value(sheet: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, pd.Timestamp):
+        value = value.to_pydatetime()
+    if isinstance(value, datetime):
+        # Same date format pandas' ExcelWriter applied before the write-only switch.
+        cell = WriteOnlyCell(sheet, value)
+        cell.number_format = EXCEL_DATETIME_FORMAT
+        return cell
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _append_frame(sheet: Any, frame: pd.DataFrame, index: bool) -> None:
+    header = list(frame.columns)
+    sheet.append([frame.index.name, *header] if index else header)
+
+    values = frame.astype(object).where(frame.notna(), None)
+    rows = values.itertuples(index=index, name=None)
+    for row in rows:
+        sheet.append([_excel_value(sheet, value) for value in row])
+
+
+def write_excel(
+    target: Any,
+    view_df: pd.DataFrame,
+    included: list[str],
+    snapshot_df: pd.DataFrame,
+    meta: dict[str, Any],
+    market: MarketCode,
+    resolved_symbols: dict[str, str] | None = None,
+    custom_assets: list[dict[str, str]] | None = None,
+) -> None:
+    metadata_rows = _export_asset_rows(included, market, resolved_symbols, custom_assets)
+
+    # Write-only sheets flush rows to temp files as they are appended, so memory stays flat
+    # no matter how many rows the MAX-range daily view has.
+    workbook = Workbook(write_only=True)
+    _append_frame(workbook.create_sheet("Datos"), view_df, index=True)
+    _append_frame(workbook.create_sheet("Activos"), pd.DataFrame(metadata_rows), index=False)
+    if not snapshot_df.empty:
+        _append_frame(workbook.create_sheet("Snapshot"), _export_snapshot(snapshot_df), index=False)
+    _append_frame(workbook.create_sheet("Info"), pd.DataFrame([_export_info_row(view_df, meta, market)]), index=False)
+    workbook.save(target)
+
+
+class ExportFormatUnavailable(RuntimeError):
+    pass
+
+
+def to_arrow_bytes(
+    view_df: pd.DataFrame,
+    included: list[str],
+    snapshot_df: pd.DataFrame,
+    meta: dict[str, Any],
+    market: MarketCode,
+    resolved_symbols: dict[str, str] | None = None,
+    custom_assets: list[dict[str, str]] | None = None,
+    file_format: Literal["arrow", "parquet"] = "arrow",
+) -> bytes:
+    if pa is None:
+        raise ExportFormatUnavailable("Exportación Arrow/Parquet no disponible: instala pyarrow en el backend")
+
+    # The view frame is the table itself (float64 columns are handed to Arrow without
+    # copying); the Activos/Snapshot/Info sheets travel as JSON in the schema metadata.
+    table = pa.Table.from_pandas(view_df.rename_axis("date"), preserve_index=True)
+    snapshot = _export_snapshot(snapshot_df)
+    extra = {
+        "finboard:activos": _export_asset_rows(included, market, resolved_symbols, custom_assets),
+        "finboard:snapshot": snapshot_to_records(snapshot) if not snapshot.empty else [],
+        "finboard:info": _export_info_row(view_df, meta, market),
+    }
+    metadata = {
+        **(table.schema.metadata or {}),
+        **{key.encode(): json.dumps(value, default=str).encode() for key, value in extra.items()},
+    }
+    table = table.replace_schema_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    if file_format == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def build_view_spec(
+    base_df: pd.DataFrame,
+    included: list[str],
+    invert_global: bool = False,
+    inverted_labels: set[str] | None = None,
+    market: MarketCode = DEFAULT_MARKET,
+) -> list[dict[str, Any]]:
+    # Same transform as build_view_df, described instead of materialized: the client
+    # applies 1/x and rounding to the base columns it already has.
+    labels = [label for label in included if label in base_df.columns]
+    inversion_map = _effective_inversion(labels, invert_global, inverted_labels)
+    return [
+        {
+            "label": flip_pair(label) if inversion_map[label] and market == "monedas" else label,
+            "source": label,
+            "invert": inversion_map[label],
+        }
+        for label in labels
+    ]
+
+
+def _column_values(values: np.ndarray) -> list[float | None]:
+    floats = values.astype(float)
+    out: list[float | None] = floats.tolist()
+    if np.isnan(floats).any():
+        for idx in np.flatnonzero(np.isnan(floats)):
+            out[idx] = None
+    return out
+
+
+def dataframe_to_columns(frame: pd.DataFrame) -> dict[str, Any]:
+    if frame.empty:
+        return {"dates": [], "columns": {}}
+
+    out = frame.sort_index()
+    return {
+        "dates": pd.to_datetime(out.index).strftime("%Y-%m-%d").tolist(),
+        "columns": {str(label): _column_values(out[label].to_numpy()) for label in out.columns},
+    }
 
 
 def dataframe_to_records(frame: pd.DataFrame) -> list[dict[str, Any]]:
@@ -796,25 +1578,28 @@ def snapshot_to_records(snapshot_df: pd.DataFrame) -> list[dict[str, Any]]:
     return records
 
 
-def _to_history_records(frame: pd.DataFrame) -> list[dict[str, Any]]:
-    if frame.empty:
-        return []
+def _history_columns(frame: pd.DataFrame) -> dict[str, Any]:
+    data = frame.sort_index()
+    missing: list[float | None] = [None] * len(data)
+    return {
+        "dates": pd.to_datetime(data.index).strftime("%Y-%m-%d").tolist(),
+        "columns": {
+            column: _column_values(data[column].to_numpy()) if column in data.columns else missing
+            for column in HISTORY_FIELDS
+        },
+    }
 
-    data = frame.copy().sort_index().replace({np.nan: None})
-    records: list[dict[str, Any]] = []
 
-    for ts, row in data.iterrows():
-        records.append(
-            {
-                "date": pd.to_datetime(ts).strftime("%Y-%m-%d"),
-                "open": None if row.get("open") is None else float(row.get("open")),
-                "high": None if row.get("high") is None else float(row.get("high")),
-                "low": None if row.get("low") is None else float(row.get("low")),
-                "close": None if row.get("close") is None else float(row.get("close")),
-            }
+def _to_history_records(frame: pd.DataFrame) -> list[dict[str, Any]]:
+    # Whole columns go through NumPy once; only the final dict assembly is per row.
+    history = _history_columns(frame)
+    columns = history["columns"]
+    return [
+        {"date": day, "open": open_, "high": high, "low": low, "close": close}
+        for day, open_, high, low, close in zip(
+            history["dates"], *(columns[column] for column in HISTORY_FIELDS)
         )
-
-    return records
+    ]
 
 
 def _safe_float_or_none(value: Any) -> float | None:
@@ -829,7 +1614,57 @@ def _safe_float_or_none(value: Any) -> float | None:
     return out
 
 
-def get_detail_payload(
+def _detail_window_start(start: str, end: str) -> str:
+    # One download covers the requested range and the trailing 52-week window behind it.
+    start_52 = (pd.to_datetime(end) - pd.Timedelta(days=WEEK_52_DAYS)).strftime("%Y-%m-%d")
+    return min(start, start_52)
+
+
+def _week_52_index(cache_key: SeriesCacheKey, base: pd.DataFrame, symbol: str, invert: bool) -> pd.DataFrame:
+    cached = get_series_cache(cache_key)
+    if cached is not None:
+        return cached[0]
+
+    close = base.sort_index()["close"].dropna()
+    if invert:
+        close = (1 / close.replace(0, np.nan)).replace([np.inf, -np.inf], np.nan).dropna()
+    # Trailing low/high for every bar; the window includes the day WEEK_52_DAYS back.
+    window = close.rolling(f"{WEEK_52_DAYS + 1}D")
+    index = pd.DataFrame({"low": window.min(), "high": window.max()})
+    set_series_cache(cache_key, (index, symbol))
+    return index
+
+
+def _detail_frames(
+    market: MarketCode,
+    instrument: str,
+    start: str,
+    end: str,
+    window_start: str,
+    effective_freq: str,
+    invert: bool,
+    indices_asset_map: AssetMap | None,
+    base: pd.DataFrame,
+    symbol: str,
+) -> tuple[pd.DataFrame, tuple[float, float]]:
+    frame = _apply_frequency(base.sort_index().loc[start:end], effective_freq) if not base.empty else base
+    if frame.empty:
+        raise ValueError("No se encontraron datos para el instrumento solicitado")
+
+    close = frame["close"].dropna()
+    if close.empty:
+        raise ValueError("No hay cierres disponibles para construir el detalle")
+
+    freq = f"{WEEK_52_SERIES_FREQ}-inv" if invert else WEEK_52_SERIES_FREQ
+    cache_key = _series_cache_key_for(market, instrument, window_start, end, freq, indices_asset_map)
+    rolling = _week_52_index(cache_key, base, symbol, invert).loc[: close.index[-1]]
+    if rolling.empty:
+        return frame, (float("nan"), float("nan"))
+    latest = rolling.iloc[-1]
+    return frame, (latest["low"], latest["high"])
+
+
+async def get_detail_payload_async(
     market: MarketCode,
     instrument: str,
     start: str,
@@ -839,22 +1674,46 @@ def get_detail_payload(
     fred_key: str,
     invert: bool = False,
     custom_assets: list[dict[str, str]] | None = None,
+    history_format: HistoryFormat = "records",
 ) -> dict[str, Any]:
     effective_freq = "B" if (freq == "D" and exclude_weekends) else freq
     indices_asset_map = build_indices_asset_map(custom_assets) if market == "indices_etfs" else None
 
-    frame, symbol = get_asset_frame(
+    window_start = _detail_window_start(start, end)
+    base, symbol = await _base_frame_async(market, instrument, window_start, end, fred_key, indices_asset_map, None)
+    frame, week_52 = await asyncio.to_thread(
+        _detail_frames,
+        market, instrument, start, end, window_start, effective_freq, invert, indices_asset_map, base, symbol,
+    )
+    return _build_detail_payload(
         market=market,
         instrument=instrument,
         start=start,
         end=end,
-        freq=effective_freq,
-        fred_key=fred_key,
+        effective_freq=effective_freq,
+        invert=invert,
         indices_asset_map=indices_asset_map,
+        frame=frame,
+        symbol=symbol,
+        week_52=week_52,
+        history_format=history_format,
     )
-    if frame.empty:
-        raise ValueError("No se encontraron datos para el instrumento solicitado")
 
+
+def _build_detail_payload(
+    *,
+    market: MarketCode,
+    instrument: str,
+    start: str,
+    end: str,
+    effective_freq: str,
+    invert: bool,
+    indices_asset_map: AssetMap | None,
+    frame: pd.DataFrame,
+    symbol: str,
+    week_52: tuple[float, float],
+    history_format: HistoryFormat = "records",
+) -> dict[str, Any]:
     display_instrument = instrument
     if invert:
         frame = _invert_ohlc(frame)
@@ -876,25 +1735,7 @@ def get_detail_payload(
         else float("nan")
     )
 
-    # 52-week range computed from last ~370 days up to latest known date.
-    start_52 = (pd.to_datetime(latest_date) - pd.Timedelta(days=370)).strftime("%Y-%m-%d")
-    end_52 = pd.to_datetime(latest_date).strftime("%Y-%m-%d")
-    frame_52, _ = get_asset_frame(
-        market=market,
-        instrument=instrument,
-        start=start_52,
-        end=end_52,
-        freq="B",
-        fred_key=fred_key,
-        indices_asset_map=indices_asset_map,
-    )
-    if invert and not frame_52.empty:
-        frame_52 = _invert_ohlc(frame_52)
-
-    close_52 = frame_52["close"].dropna() if not frame_52.empty else close
-
-    low_52 = close_52.min() if not close_52.empty else float("nan")
-    high_52 = close_52.max() if not close_52.empty else float("nan")
+    low_52, high_52 = week_52
 
     if market == "monedas":
         source = "yahoo_fx"
@@ -927,7 +1768,7 @@ def get_detail_payload(
             "volume": None,
             "avg_volume": None,
         },
-        "history": _to_history_records(frame),
+        "history": _history_columns(frame) if history_format == "columnar" else _to_history_records(frame),
         "meta": {
             "sdate": start,
             "edate": end,
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import random
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Awaitable, Callable, NamedTuple, get_args
+
+from ..config import MarketCode
+from .fetch_cache import DEFAULT_FETCH_CACHE_TTL, FETCH_CACHE_BACKEND
+
+# uvicorn and gunicorn both take their default worker count from WEB_CONCURRENCY.
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+
+def prewarm_enabled_by_default(workers: int, cache_backend: str) -> bool:
+    # Every worker runs its own loop; several of them only add up to one prewarm when they share
+    # the SQLite fetch cache, where each run skips what another worker already refreshed.
+    return workers <= 1 or cache_backend == "sqlite"
+
+
+PREWARM_ENABLED = os.getenv(
+    "PREWARM_ENABLED", "1" if prewarm_enabled_by_default(WEB_CONCURRENCY, FETCH_CACHE_BACKEND) else "0"
+).strip().lower() not in {"0", "false", "no"}
+# Random extra delay per run so workers started together don't refresh the same targets in lockstep.
+PREWARM_JITTER_SECONDS = float(os.getenv("PREWARM_JITTER_SECONDS", "0" if WEB_CONCURRENCY <= 1 else "10"))
+# market:preset:frequency entries; the defaults match what the dashboards request on first load.
+PREWARM_TARGETS = os.getenv("PREWARM_TARGETS", "indices_etfs:YTD:D,monedas:YTD:D")
+# Refresh just before the fetch cache TTL runs out so default views never miss.
+PREWARM_INTERVAL_SECONDS = int(os.getenv("PREWARM_INTERVAL_SECONDS", str(max(30, DEFAULT_FETCH_CACHE_TTL - 15))))
+PREWARM_INITIAL_DELAY_SECONDS = float(os.getenv("PREWARM_INITIAL_DELAY_SECONDS", "5"))
+# Extra runs (UTC) right after providers publish the new daily bar: FRED's morning
+# release, the European close on Stooq and the US close on Yahoo.
+PREWARM_ALIGN_UTC = os.getenv("PREWARM_ALIGN_UTC", "13:30,16:45,21:15")
+
+FREQUENCIES = {"D", "W", "M"}
+
+
+class PrewarmTarget(NamedTuple):
+    market: MarketCode
+    preset: str
+    frequency: str
+
+
+def parse_prewarm_targets(raw: str) -> list[PrewarmTarget]:
+    targets: list[PrewarmTarget] = []
+    for item in raw.split(","):
+        parts = [part.strip() for part in item.split(":")]
+        if len(parts) != 3:
+            continue
+        market, preset, frequency = parts
+        if market not in get_args(MarketCode) or frequency not in FREQUENCIES or not preset:
+            continue
+        targets.append(PrewarmTarget(market, preset, frequency))
+    return list(dict.fromkeys(targets))
+
+
+def parse_align_times(raw: str) -> list[time]:
+    times: list[time] = []
+    for item in raw.split(","):
+        try:
+            hour, minute = (int(part) for part in item.strip().split(":"))
+            times.append(time(hour, minute))
+        except ValueError:
+            continue
+    return times
+
+
+def seconds_until_next_run(now: datetime, interval: float, align_times: list[time]) -> float:
+    delay = float(interval)
+    for aligned in align_times:
+        candidate = now.replace(hour=aligned.hour, minute=aligned.minute, second=0, microsecond=0)
+        if candidate <= now:
+            candidate += timedelta(days=1)
+        delay = min(delay, (candidate - now).total_seconds())
+    return max(1.0, delay)
+
+
+def prewarm_is_due(age: float | None, interval: float = PREWARM_INTERVAL_SECONDS) -> bool:
+    # Another worker sharing the fetch cache may have refreshed the entry already; skip it while
+    # it would still be fresh at our next run.
+    return age is None or age + interval >= DEFAULT_FETCH_CACHE_TTL
+
+
+async def run_prewarm_loop(
+    refresh: Callable[[PrewarmTarget], Awaitable[Any]],
+    targets: list[PrewarmTarget] | None = None,
+    interval: float = PREWARM_INTERVAL_SECONDS,
+    align_times: list[time] | None = None,
+    initial_delay: float = PREWARM_INITIAL_DELAY_SECONDS,
+    jitter: float = PREWARM_JITTER_SECONDS,
+) -> None:
+    targets = parse_prewarm_targets(PREWARM_TARGETS) if targets is None else targets
+    align_times = parse_align_times(PREWARM_ALIGN_UTC) if align_times is None else align_times
+    if not targets:
+        return
+
+    await asyncio.sleep(initial_delay + random.uniform(0, jitter))
+    while True:
+        for target in targets:
+            try:
+                await refresh(target)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # A failing provider must not stop the other targets or later runs.
+                pass
+        delay = seconds_until_next_run(datetime.now(timezone.utc), interval, align_times)
+        await asyncio.sleep(delay + random.uniform(0, jitter))
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+PROVIDER_RATE_LIMITS = {
+    "fred": float(os.getenv("FRED_RATE_PER_SECOND", "4")),
+    "stooq": float(os.getenv("STOOQ_RATE_PER_SECOND", "2")),
+    "yahoo": float(os.getenv("YAHOO_RATE_PER_SECOND", "4")),
+}
+DEFAULT_PROVIDER_RATE = float(os.getenv("PROVIDER_RATE_PER_SECOND", "4"))
+PROVIDER_BURST = int(os.getenv("PROVIDER_BURST", "4"))
+# A call that would have to queue longer than this for a token fails fast instead of holding a worker.
+PROVIDER_MAX_WAIT_SECONDS = float(os.getenv("PROVIDER_MAX_WAIT_SECONDS", "5"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+# Status codes that mean the provider itself is struggling, not that the symbol is bad.
+PROVIDER_FAILURE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class ProviderUnavailable(RuntimeError):
+    def __init__(self, provider: str, reason: str) -> None:
+        super().__init__(f"Proveedor {provider} no disponible: {reason}")
+        self.provider = provider
+        self.reason = reason
+
+
+def _now() -> float:
+    return time.monotonic()
+
+
+class ProviderGuard:
+    def __init__(self, provider: str, rate: float, burst: int) -> None:
+        self.provider = provider
+        self.rate = max(rate, 0.001)
+        self.capacity = float(max(1, burst))
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._refilled_at = _now()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {"calls": 0, "failures": 0, "rejected": 0, "throttled_seconds": 0.0}
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def reserve(self) -> float:
+        # Returns how long the caller must wait before issuing the request.
+        with self._lock:
+            now = _now()
+            if self._state == "open":
+                if now - self._opened_at < CIRCUIT_RESET_SECONDS:
+                    self._stats["rejected"] += 1
+                    raise ProviderUnavailable(self.provider, "circuito abierto")
+                self._state = "half_open"
+            if self._state == "half_open":
+                if self._probe_in_flight:
+                    self._stats["rejected"] += 1
+                    raise ProviderUnavailable(self.provider, "circuito en prueba")
+                self._probe_in_flight = True
+
+            self._refill(now)
+            wait = max(0.0, (1.0 - self._tokens) / self.rate)
+            if wait > PROVIDER_MAX_WAIT_SECONDS:
+                self._probe_in_flight = False
+                self._stats["rejected"] += 1
+                raise ProviderUnavailable(self.provider, "limite de solicitudes")
+            self._tokens -= 1.0
+            self._stats["calls"] += 1
+            self._stats["throttled_seconds"] += wait
+            return wait
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == "half_open" or self._failures >= CIRCUIT_FAILURE_THRESHOLD:
+                self._state = "open"
+                self._opened_at = _now()
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            now = _now()
+            self._refill(now)
+            retry_in = 0.0
+            if self._state == "open":
+                retry_in = max(0.0, CIRCUIT_RESET_SECONDS - (now - self._opened_at))
+            return {
+                "provider": self.provider,
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in_seconds": round(retry_in, 1),
+                "rate_per_second": self.rate,
+                "tokens_available": round(self._tokens, 2),
+                "calls": self._stats["calls"],
+                "failures": self._stats["failures"],
+                "rejected": self._stats["rejected"],
+                "throttled_seconds": round(self._stats["throttled_seconds"], 2),
+            }
+
+
+_GUARDS_LOCK = threading.Lock()
+_GUARDS: dict[str, ProviderGuard] = {}
+
+
+def get_guard(provider: str) -> ProviderGuard:
+    with _GUARDS_LOCK:
+        guard = _GUARDS.get(provider)
+        if guard is None:
+            guard = ProviderGuard(provider, PROVIDER_RATE_LIMITS.get(provider, DEFAULT_PROVIDER_RATE), PROVIDER_BURST)
+            _GUARDS[provider] = guard
+        return guard
+
+
+def guarded_call(provider: str, fn: Callable[[], T], is_failure: Callable[[T], bool] | None = None) -> T:
+    guard = get_guard(provider)
+    wait = guard.reserve()
+    if wait:
+        time.sleep(wait)
+    try:
+        result = fn()
+    except Exception:
+        guard.record_failure()
+        raise
+    if is_failure is not None and is_failure(result):
+        guard.record_failure()
+    else:
+        guard.record_success()
+    return result
+
+
+async def guarded_call_async(
+    provider: str,
+    fn: Callable[[], Awaitable[T]],
+    is_failure: Callable[[T], bool] | None = None,
+) -> T:
+    guard = get_guard(provider)
+    wait = guard.reserve()
+    try:
+        if wait:
+            await asyncio.sleep(wait)
+        result = await fn()
+    except asyncio.CancelledError:
+        guard.release()
+        raise
+    except Exception:
+        guard.record_failure()
+        raise
+    if is_failure is not None and is_failure(result):
+        guard.record_failure()
+    else:
+        guard.record_success()
+    return result
+
+
+def providers_status() -> list[dict[str, Any]]:
+    for provider in PROVIDER_RATE_LIMITS:
+        get_guard(provider)
+    with _GUARDS_LOCK:
+        guards = list(_GUARDS.values())
+    return [guard.status() for guard in guards]
+
+
+def reset_provider_guards() -> None:
+    with _GUARDS_LOCK:
+        _GUARDS.clear()
@@ -0,0 +1,336 @@
+import asyncio
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import pandas as pd
+
+from .failure_backoff import is_meaningful_miss
+from .provider_guard import ProviderUnavailable
+
+DEFAULT_SERIES_STORE_PATH = Path(__file__).resolve().parents[2] / ".series_store.sqlite3"
+SERIES_STORE_PATH = Path(os.getenv("SERIES_STORE_PATH", str(DEFAULT_SERIES_STORE_PATH)))
+SERIES_STORE_ENABLED = os.getenv("SERIES_STORE_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+# The latest bar of a series can still move intraday; re-read the tail once this window passes.
+SERIES_STORE_TAIL_TTL_SECONDS = int(os.getenv("SERIES_STORE_TAIL_TTL_SECONDS", "900"))
+# A head range that came back empty (e.g. before the listing date) is covered but re-checked after this.
+SERIES_STORE_EMPTY_HEAD_TTL_SECONDS = int(os.getenv("SERIES_STORE_EMPTY_HEAD_TTL_SECONDS", "86400"))
+# Adjusted closes are rebased by the provider on every dividend/split; refetch whole series at least this often.
+SERIES_STORE_MAX_AGE_SECONDS = int(os.getenv("SERIES_STORE_MAX_AGE_SECONDS", str(3 * 86400)))
+# Relative change in a re-read close that counts as a new adjustment basis rather than float noise.
+ADJUSTMENT_DRIFT_TOLERANCE = 1e-4
+
+OHLC_COLUMNS = ["open", "high", "low", "close"]
+OhlcFetcher = Callable[[str, str], pd.DataFrame]
+AsyncOhlcFetcher = Callable[[str, str], Awaitable[pd.DataFrame]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ohlc (
+    source TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    PRIMARY KEY (source, symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    source TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    head_checked_at REAL,
+    rebased_at REAL,
+    PRIMARY KEY (source, symbol)
+);
+"""
+# Columns added after the first release; stores created earlier get them on first open (NULL = never).
+_COVERAGE_ADDED_COLUMNS = ("head_checked_at", "rebased_at")
+
+_INIT_LOCK = threading.Lock()
+_INITIALIZED_PATHS: set[str] = set()
+
+
+def _connect() -> sqlite3.Connection:
+    path = SERIES_STORE_PATH
+    conn = sqlite3.connect(str(path), timeout=30)
+    key = str(path)
+    if key not in _INITIALIZED_PATHS:
+        with _INIT_LOCK:
+            if key not in _INITIALIZED_PATHS:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                existing = {row[1] for row in conn.execute("PRAGMA table_info(coverage)")}
+                for column in _COVERAGE_ADDED_COLUMNS:
+                    if column not in existing:
+                        conn.execute(f"ALTER TABLE coverage ADD COLUMN {column} REAL")
+                conn.commit()
+                _INITIALIZED_PATHS.add(key)
+    return conn
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=OHLC_COLUMNS)
+
+
+def _shift_day(value: str, days: int) -> str:
+    return (pd.to_datetime(value) + pd.Timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def read_series(source: str, symbol: str, start: str, end: str) -> pd.DataFrame:
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT date, open, high, low, close FROM ohlc "
+            "WHERE source = ? AND symbol = ? AND date BETWEEN ? AND ? ORDER BY date",
+            (source, symbol, start, end),
+        ).fetchall()
+    if not rows:
+        return _empty_frame()
+
+    frame = pd.DataFrame.from_records(rows, columns=["date", *OHLC_COLUMNS])
+    frame.index = pd.to_datetime(frame.pop("date"))
+    frame.index.name = None
+    return frame.astype(float)
+
+
+def write_series(source: str, symbol: str, frame: pd.DataFrame, replace: bool = False) -> int:
+    if frame.empty:
+        return 0
+
+    data = frame.reindex(columns=OHLC_COLUMNS).astype(float)
+    data = data.astype(object).where(data.notna(), None)
+    dates = pd.to_datetime(data.index).strftime("%Y-%m-%d")
+    rows = [
+        (source, symbol, day, *values)
+        for day, values in zip(dates, data.itertuples(index=False, name=None))
+    ]
+    with closing(_connect()) as conn:
+        if replace:
+            # Same transaction as the insert, so readers never see the series half gone.
+            conn.execute("DELETE FROM ohlc WHERE source = ? AND symbol = ?", (source, symbol))
+        conn.executemany("INSERT OR REPLACE INTO ohlc VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+    return len(rows)
+
+
+def get_coverage(source: str, symbol: str) -> dict[str, Any] | None:
+    bars = "FROM ohlc WHERE source = c.source AND symbol = c.symbol"
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT start_date, end_date, updated_at, head_checked_at, rebased_at, "
+            f"(SELECT MIN(date) {bars}), (SELECT MAX(date) {bars}), "
+            f"(SELECT date {bars} ORDER BY date DESC LIMIT 1 OFFSET 1) "
+            "FROM coverage AS c WHERE source = ? AND symbol = ?",
+            (source, symbol),
+        ).fetchone()
+    if row is None or row[6] is None:
+        return None
+    return {
+        "start": row[0],
+        "end": row[1],
+        "updated_at": float(row[2]),
+        "head_checked_at": row[3],
+        "rebased_at": row[4],
+        "first_bar": row[5],
+        "last_bar": row[6],
+        # The bar before the last one; tail refreshes start here to detect a changed adjustment basis.
+        "anchor": row[7] or row[6],
+    }
+
+
+def set_coverage(
+    source: str,
+    symbol: str,
+    start: str,
+    end: str,
+    updated_at: float | None = None,
+    head_checked_at: float | None = None,
+    rebased_at: float | None = None,
+) -> None:
+    with closing(_connect()) as conn:
+        conn.execute(
+            "INSERT INTO coverage VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (source, symbol) DO UPDATE SET "
+            "start_date = excluded.start_date, end_date = excluded.end_date, updated_at = excluded.updated_at, "
+            "head_checked_at = COALESCE(excluded.head_checked_at, head_checked_at), "
+            "rebased_at = COALESCE(excluded.rebased_at, rebased_at)",
+            (
+                source,
+                symbol,
+                start,
+                end,
+                time.time() if updated_at is None else updated_at,
+                head_checked_at,
+                rebased_at,
+            ),
+        )
+        conn.commit()
+
+
+def clear_series_store() -> None:
+    with closing(_connect()) as conn:
+        conn.execute("DELETE FROM ohlc")
+        conn.execute("DELETE FROM coverage")
+        conn.commit()
+
+
+def _rebase_due(coverage: dict[str, Any]) -> bool:
+    return time.time() - (coverage["rebased_at"] or 0.0) > SERIES_STORE_MAX_AGE_SECONDS
+
+
+def _rebase_range(coverage: dict[str, Any], start: str, end: str) -> tuple[str, str]:
+    return min(start, coverage["start"]), max(end, coverage["end"])
+
+
+def _empty_head_due(coverage: dict[str, Any], start: str) -> bool:
+    # Short barless heads are weekends/holidays; only a real gap is worth asking for again.
+    if not is_meaningful_miss(start, _shift_day(coverage["first_bar"], -1)):
+        return False
+    return time.time() - (coverage["head_checked_at"] or 0.0) > SERIES_STORE_EMPTY_HEAD_TTL_SECONDS
+
+
+def _missing_ranges(coverage: dict[str, Any], start: str, end: str) -> list[tuple[str, str]]:
+    ranges: list[tuple[str, str]] = []
+    if start < coverage["start"]:
+        ranges.append((start, _shift_day(coverage["start"], -1)))
+    elif start < coverage["first_bar"] and _empty_head_due(coverage, start):
+        ranges.append((start, _shift_day(coverage["first_bar"], -1)))
+
+    tail_is_stale = time.time() - coverage["updated_at"] > SERIES_STORE_TAIL_TTL_SECONDS
+    if end > coverage["end"] or (end > coverage["last_bar"] and tail_is_stale):
+        # Restart one bar before the last stored one: the last bar may be partial (intraday) and the
+        # one before it shows whether the provider has since rebased its adjusted closes.
+        ranges.append((coverage["anchor"], end))
+    return ranges
+
+
+def _planned_ranges(coverage: dict[str, Any] | None, start: str, end: str) -> list[tuple[str, str]]:
+    if coverage is None:
+        return [(start, end)]
+    if _rebase_due(coverage):
+        return [_rebase_range(coverage, start, end)]
+    return _missing_ranges(coverage, start, end)
+
+
+def _adjustment_drifted(
+    source: str,
+    symbol: str,
+    coverage: dict[str, Any] | None,
+    fetched: list[tuple[tuple[str, str], pd.DataFrame]],
+) -> bool:
+    # Yahoo's adjusted closes move for every past bar after a dividend or split, and stored bars are
+    # never rewritten incrementally; a re-read anchor bar that no longer matches means the basis changed.
+    if coverage is None or _rebase_due(coverage):
+        return False
+    anchor = coverage["anchor"]
+    for (range_start, _), frame in fetched:
+        if range_start != anchor or frame.empty:
+            continue
+        fresh = frame["close"][pd.to_datetime(frame.index).strftime("%Y-%m-%d") == anchor]
+        stored = read_series(source, symbol, anchor, anchor)["close"]
+        if fresh.empty or stored.empty or pd.isna(fresh.iloc[0]) or pd.isna(stored.iloc[0]):
+            return False
+        return not math.isclose(fresh.iloc[0], stored.iloc[0], rel_tol=ADJUSTMENT_DRIFT_TOLERANCE)
+    return False
+
+
+def _merge_fetched(
+    source: str,
+    symbol: str,
+    coverage: dict[str, Any] | None,
+    start: str,
+    end: str,
+    fetched: list[tuple[tuple[str, str], pd.DataFrame]],
+    rebase: bool = False,
+) -> pd.DataFrame:
+    if coverage is None or rebase:
+        (range_start, range_end), frame = fetched[0]
+        if frame.empty:
+            # Most likely a failed download; keep whatever is stored instead of wiping it.
+            return frame if coverage is None else read_series(source, symbol, start, end)
+        write_series(source, symbol, frame, replace=True)
+        first_bar = pd.to_datetime(frame.index.min()).strftime("%Y-%m-%d")
+        now = time.time()
+        set_coverage(
+            source, symbol, min(range_start, first_bar), range_end, updated_at=now, head_checked_at=now, rebased_at=now
+        )
+        return read_series(source, symbol, start, end)
+
+    cov_start, cov_end = coverage["start"], coverage["end"]
+    tail_fetched = False
+    head_checked_at = None
+    for (range_start, range_end), frame in fetched:
+        write_series(source, symbol, frame)
+        if range_end >= end and range_start == coverage["anchor"]:
+            tail_fetched = True
+            cov_end = max(cov_end, end)
+        else:
+            # Covered even when empty (e.g. before the listing date); _empty_head_due decides when to re-check.
+            cov_start = min(cov_start, range_start)
+            head_checked_at = time.time()
+
+    if tail_fetched or head_checked_at is not None:
+        updated_at = None if tail_fetched else coverage["updated_at"]
+        set_coverage(source, symbol, cov_start, cov_end, updated_at=updated_at, head_checked_at=head_checked_at)
+    return read_series(source, symbol, start, end)
+
+
+def pending_ranges(source: str, symbol: str, start: str, end: str) -> list[tuple[str, str]]:
+    if not SERIES_STORE_ENABLED:
+        return [(start, end)]
+    return _planned_ranges(get_coverage(source, symbol), start, end)
+
+
+def load_ohlc(source: str, symbol: str, start: str, end: str, fetcher: OhlcFetcher) -> pd.DataFrame:
+    if not SERIES_STORE_ENABLED:
+        return fetcher(start, end)
+
+    coverage = get_coverage(source, symbol)
+    rebase = coverage is not None and _rebase_due(coverage)
+    try:
+        ranges = _planned_ranges(coverage, start, end)
+        fetched = [((range_start, range_end), fetcher(range_start, range_end)) for range_start, range_end in ranges]
+        if _adjustment_drifted(source, symbol, coverage, fetched):
+            full_range = _rebase_range(coverage, start, end)
+            fetched, rebase = [(full_range, fetcher(*full_range))], True
+    except ProviderUnavailable:
+        # Provider is throttled or circuit-broken: serve what is stored instead of failing.
+        if coverage is None:
+            raise
+        return read_series(source, symbol, start, end)
+    return _merge_fetched(source, symbol, coverage, start, end, fetched, rebase)
+
+
+async def load_ohlc_async(
+    source: str,
+    symbol: str,
+    start: str,
+    end: str,
+    fetcher: AsyncOhlcFetcher,
+) -> pd.DataFrame:
+    if not SERIES_STORE_ENABLED:
+        return await fetcher(start, end)
+
+    # SQLite calls block (busy timeout up to 30 s), so they run off the event loop.
+    coverage = await asyncio.to_thread(get_coverage, source, symbol)
+    rebase = coverage is not None and _rebase_due(coverage)
+    try:
+        ranges = _planned_ranges(coverage, start, end)
+        fetched = [
+            ((range_start, range_end), await fetcher(range_start, range_end)) for range_start, range_end in ranges
+        ]
+        if await asyncio.to_thread(_adjustment_drifted, source, symbol, coverage, fetched):
+            full_range = _rebase_range(coverage, start, end)
+            fetched, rebase = [(full_range, await fetcher(*full_range))], True
+    except ProviderUnavailable:
+        if coverage is None:
+            raise
+        return await asyncio.to_thread(read_series, source, symbol, start, end)
+    return await asyncio.to_thread(_merge_fetched, source, symbol, coverage, start, end, fetched, rebase)
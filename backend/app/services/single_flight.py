@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+ProgressListener = Callable[..., None]
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+        self.events: list[tuple[Any, ...]] = []
+        self.listeners: list[ProgressListener] = []
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+    def publish(self, *event: Any) -> None:
+        with self.lock:
+            self.events.append(event)
+            for listener in self.listeners:
+                listener(*event)
+
+    def subscribe(self, listener: ProgressListener) -> None:
+        # Replay what already happened so late joiners report the same progress.
+        with self.lock:
+            for event in self.events:
+                listener(*event)
+            self.listeners.append(listener)
+
+
+# Collapses concurrent calls sharing a key into one execution; followers wait and get its result.
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._flights
+
+    def run(
+        self,
+        key: Hashable,
+        fn: Callable[[ProgressListener], Any],
+        progress_hook: ProgressListener | None = None,
+    ) -> tuple[Any, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if progress_hook:
+            flight.subscribe(progress_hook)
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, False
+
+        try:
+            flight.result = fn(flight.publish)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+        return flight.result, True
+
+
+# Asyncio counterpart of SingleFlight; one instance per event loop.
+class AsyncSingleFlight:
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, tuple[_Flight, asyncio.Future]] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def run(
+        self,
+        key: Hashable,
+        fn: Callable[[ProgressListener], Awaitable[Any]],
+        progress_hook: ProgressListener | None = None,
+    ) -> tuple[Any, bool]:
+        current = self._flights.get(key)
+        if current is not None:
+            flight, future = current
+            if progress_hook:
+                flight.subscribe(progress_hook)
+            return await asyncio.shield(future), False
+
+        flight = _Flight()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._flights[key] = (flight, future)
+        if progress_hook:
+            flight.subscribe(progress_hook)
+
+        try:
+            result = await fn(flight.publish)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark as retrieved so a flight without followers does not log a warning.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._flights.pop(key, None)
+        return result, True
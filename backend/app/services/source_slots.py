@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable
+
+
+class _Waiter:
+    __slots__ = ("granted", "notify")
+
+    def __init__(self, notify: Callable[[], None]) -> None:
+        self.granted = False
+        self.notify = notify
+
+
+# Counting semaphore usable from threads (`with`) and from any event loop (`async with`), so sync
+# exports and async dashboard loads draw from the same per-provider cap. Released slots are handed
+# straight to the oldest waiter.
+class SourceSemaphore:
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self._lock = threading.Lock()
+        self._free = self.limit
+        self._waiters: deque[_Waiter] = deque()
+
+    def _try_acquire(self, waiter: _Waiter) -> bool:
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return True
+            self._waiters.append(waiter)
+            return False
+
+    def acquire(self) -> None:
+        event = threading.Event()
+        if not self._try_acquire(_Waiter(event.set)):
+            event.wait()
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+
+        def wake() -> None:
+            if not future.done():
+                future.set_result(None)
+
+        def notify() -> None:
+            try:
+                loop.call_soon_threadsafe(wake)
+            except RuntimeError:
+                # The waiting loop is gone; pass the slot on instead of leaking it.
+                self.release()
+
+        waiter = _Waiter(notify)
+        if self._try_acquire(waiter):
+            return
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                if self._free >= self.limit:
+                    raise ValueError("SourceSemaphore liberado mas veces de las adquiridas")
+                self._free += 1
+                return
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        waiter.notify()
+
+    def __enter__(self) -> "SourceSemaphore":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "SourceSemaphore":
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.release()
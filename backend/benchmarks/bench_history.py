@@ -0,0 +1,72 @@
+import argparse
+import json
+import timeit
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from backend.app.services.market_data import _history_columns, _to_history_records
+
+
+def _iterrows_history_records(frame: pd.DataFrame) -> list[dict[str, Any]]:
+    # Previous implementation, kept as the baseline the vectorized path must match.
+    if frame.empty:
+        return []
+
+    data = frame.copy().sort_index().replace({np.nan: None})
+    records: list[dict[str, Any]] = []
+
+    for ts, row in data.iterrows():
+        records.append(
+            {
+                "date": pd.to_datetime(ts).strftime("%Y-%m-%d"),
+                "open": None if row.get("open") is None else float(row.get("open")),
+                "high": None if row.get("high") is None else float(row.get("high")),
+                "low": None if row.get("low") is None else float(row.get("low")),
+                "close": None if row.get("close") is None else float(row.get("close")),
+            }
+        )
+
+    return records
+
+
+def _sample_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    frame = pd.DataFrame(
+        {"open": close * 0.999, "high": close * 1.01, "low": close * 0.99, "close": close},
+        index=pd.bdate_range("1994-01-03", periods=rows),
+    )
+    frame.iloc[::97] = np.nan
+    return frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara la serializacion del historial de /api/detail.")
+    parser.add_argument("--rows", type=int, default=8000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frame = _sample_frame(args.rows)
+    assert _to_history_records(frame) == _iterrows_history_records(frame)
+
+    builders = {
+        "iterrows (anterior)": _iterrows_history_records,
+        "vectorizado records": _to_history_records,
+        "vectorizado columnar": _history_columns,
+    }
+    baseline: dict[str, float] = {}
+    print(f"{args.rows} filas, mejor de {args.repeat}")
+    for name, build in builders.items():
+        timings = {
+            "build": min(timeit.repeat(lambda: build(frame), number=1, repeat=args.repeat)),
+            "build+json": min(timeit.repeat(lambda: json.dumps(build(frame)), number=1, repeat=args.repeat)),
+        }
+        for stage, best in timings.items():
+            baseline.setdefault(stage, best)
+            print(f"{name:<22} {stage:<11} {best * 1000:9.2f} ms  x{baseline[stage] / best:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from backend.app.services.fetch_cache import serialize_payload
+from backend.app.services.market_data import dataframe_to_records
+
+
+def _sample_payload(rows: int, assets: int) -> dict:
+    rng = np.random.default_rng(11)
+    frame = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, (rows, assets)), axis=0)),
+        index=pd.bdate_range("1994-01-03", periods=rows),
+        columns=[f"Activo {idx}" for idx in range(assets)],
+    )
+    frame.iloc[::53, ::3] = np.nan
+    records = dataframe_to_records(frame)
+    return {"meta": {"market": "indices_etfs"}, "base_rows": records, "view_rows": records}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara la serializacion JSON de las respuestas de datos.")
+    parser.add_argument("--rows", type=int, default=8000)
+    parser.add_argument("--assets", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = _sample_payload(args.rows, args.assets)
+    assert json.loads(serialize_payload(payload)) == json.loads(json.dumps(jsonable_encoder(payload)))
+
+    cases = {
+        "jsonable_encoder+json": lambda: json.dumps(jsonable_encoder(payload)).encode("utf-8"),
+        "serialize_payload": lambda: serialize_payload(payload),
+    }
+    baseline = None
+    print(f"{args.rows} filas x {args.assets} activos, mejor de {args.repeat}")
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print(f"{name:<22} {best * 1000:9.2f} ms  x{baseline / best:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
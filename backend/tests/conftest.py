@@ -0,0 +1,10 @@
+import pytest
+
+from backend.app.services import currency_memo, series_store
+
+
+@pytest.fixture(autouse=True)
+def _isolated_local_stores(monkeypatch, tmp_path):
+    # Keep the SQLite series store and the FX winner memo out of the working tree.
+    monkeypatch.setattr(series_store, "SERIES_STORE_PATH", tmp_path / "series.sqlite3")
+    monkeypatch.setattr(currency_memo, "CURRENCY_MEMO_PATH", tmp_path / "winners.json")
@@ -1,8 +1,20 @@
+import asyncio
+import io
+import json
+import time
+from datetime import date
+
+import openpyxl
 import pandas as pd
+import pytest
 from fastapi.testclient import TestClient
 
-from backend.app.main import app
-from backend.app.services.fetch_cache import clear_fetch_cache
+from backend.app import main
+from backend.app.main import _build_fetch_response_async, _prewarm, app
+from backend.app.schemas import FetchRequest
+from backend.app.services import fetch_cache
+from backend.app.services.prewarm import PrewarmTarget
+from backend.app.services.fetch_cache import clear_fetch_cache, clear_series_cache
 
 
 def _payload() -> dict:
@@ -53,6 +65,10 @@ def _mock_fetch_all_assets(*args, **kwargs):
     return base_df, snapshot_df, [], {"S&P 500": "SP500"}
 
 
+async def _mock_fetch_all_assets_async(*args, **kwargs):
+    return _mock_fetch_all_assets(*args, **kwargs)
+
+
 def test_health_ok():
     client = TestClient(app)
     response = client.get("/api/health")
@@ -64,11 +80,11 @@ def test_fetch_uses_cache(monkeypatch):
     clear_fetch_cache()
     calls = {"count": 0}
 
-    def wrapped_mock(*args, **kwargs):
+    async def wrapped_mock(*args, **kwargs):
         calls["count"] += 1
         return _mock_fetch_all_assets(*args, **kwargs)
 
-    monkeypatch.setattr("backend.app.main.fetch_all_assets", wrapped_mock)
+    monkeypatch.setattr("backend.app.main.fetch_all_assets_async", wrapped_mock)
     client = TestClient(app)
 
     response_1 = client.post("/api/fetch", json=_payload())
@@ -85,7 +101,7 @@ def test_fetch_uses_cache(monkeypatch):
 
 def test_fetch_stream_returns_progress_and_result(monkeypatch):
     clear_fetch_cache()
-    monkeypatch.setattr("backend.app.main.fetch_all_assets", _mock_fetch_all_assets)
+    monkeypatch.setattr("backend.app.main.fetch_all_assets_async", _mock_fetch_all_assets_async)
     client = TestClient(app)
 
     with client.stream("POST", "/api/fetch/stream", json=_payload()) as response:
@@ -95,3 +111,282 @@ def test_fetch_stream_returns_progress_and_result(monkeypatch):
     assert "event: progress" in text
     assert "event: result" in text
     assert "S&P 500" in text
+
+    result_block = next(block for block in text.split("\n\n") if block.startswith("event: result"))
+    result = json.loads(result_block.split("data: ", 1)[1])
+    assert result["response"]["assets_loaded"] == ["S&P 500"]
+    assert result["cache_hit"] is False
+
+
+def test_presentation_changes_reuse_series_cache(monkeypatch):
+    clear_fetch_cache()
+    clear_series_cache()
+    calls = {"count": 0}
+
+    async def fake_indices_frame(label, start, end, freq, fred_key, asset_map=None, yahoo_batch=None):
+        calls["count"] += 1
+        frame = pd.DataFrame(
+            {"open": [6021.1, 6055.2], "high": [6021.1, 6055.2], "low": [6021.1, 6055.2], "close": [6021.1, 6055.2]},
+            index=pd.to_datetime(["2026-02-13", "2026-02-16"]),
+        )
+        return frame, "SP500"
+
+    monkeypatch.setattr("backend.app.services.market_data.get_indices_frame_async", fake_indices_frame)
+    client = TestClient(app)
+
+    response_1 = client.post("/api/fetch", json=_payload())
+    response_2 = client.post("/api/fetch", json={**_payload(), "invert_global": True})
+
+    assert response_1.status_code == 200
+    assert response_2.status_code == 200
+    assert calls["count"] == 1
+    assert response_2.json()["view_rows"][-1]["S&P 500"] == round(1 / 6055.2, 6)
+
+
+def test_concurrent_identical_fetches_are_coalesced(monkeypatch):
+    clear_fetch_cache()
+    calls = {"count": 0}
+
+    async def slow_mock(*args, **kwargs):
+        calls["count"] += 1
+        await asyncio.sleep(0.2)
+        return _mock_fetch_all_assets(*args, **kwargs)
+
+    monkeypatch.setattr("backend.app.main.fetch_all_assets_async", slow_mock)
+    events: list[list[tuple]] = [[], []]
+
+    async def run(slot: int) -> tuple[object, bool]:
+        await asyncio.sleep(0.05 * slot)
+        hook = lambda *event: events[slot].append(event)
+        return await _build_fetch_response_async(FetchRequest(**_payload()), progress_hook=hook)
+
+    async def scenario() -> list[tuple[object, bool]]:
+        return list(await asyncio.gather(run(0), run(1)))
+
+    results = asyncio.run(scenario())
+
+    assert calls["count"] == 1
+    assert results[0][0] is results[1][0]
+    assert sorted(hit for _, hit in results) == [False, True]
+    assert events[0] == events[1] == [(0, 1, "S&P 500", "fetching"), (1, 1, "S&P 500", "loaded")]
+
+
+def test_providers_status_lists_each_provider():
+    client = TestClient(app)
+    response = client.get("/api/providers/status")
+
+    assert response.status_code == 200
+    providers = {row["provider"]: row for row in response.json()["providers"]}
+    assert {"fred", "stooq", "yahoo"} <= set(providers)
+    assert providers["yahoo"]["state"] in {"closed", "open", "half_open"}
+
+
+def test_expired_fetch_is_served_stale_and_refreshed_in_background(monkeypatch):
+    clear_fetch_cache()
+    monkeypatch.setattr("backend.app.main.PREWARM_ENABLED", False)
+    clock = {"now": 10_000.0}
+    monkeypatch.setattr(fetch_cache, "_now", lambda: clock["now"])
+    calls = {"count": 0}
+
+    async def counting_mock(*args, **kwargs):
+        calls["count"] += 1
+        return _mock_fetch_all_assets(*args, **kwargs)
+
+    monkeypatch.setattr("backend.app.main.fetch_all_assets_async", counting_mock)
+
+    with TestClient(app) as client:
+        fresh = client.post("/api/fetch", json=_payload()).json()
+        assert "stale" not in fresh["meta"]
+
+        clock["now"] += fetch_cache.DEFAULT_FETCH_CACHE_TTL + 30
+        stale = client.post("/api/fetch", json=_payload()).json()
+        assert stale["meta"]["stale"] is True
+        assert stale["meta"]["age_seconds"] == fetch_cache.DEFAULT_FETCH_CACHE_TTL + 30
+        assert stale["view_rows"] == fresh["view_rows"]
+
+        for _ in range(50):
+            refreshed = client.post("/api/fetch", json=_payload()).json()
+            if "stale" not in refreshed["meta"]:
+                break
+            time.sleep(0.02)
+
+        clock["now"] += fetch_cache.DEFAULT_FETCH_CACHE_TTL + fetch_cache.DEFAULT_FETCH_CACHE_MAX_STALE + 1
+        expired = client.post("/api/fetch", json=_payload()).json()
+
+    assert calls["count"] == 3
+    assert "stale" not in refreshed["meta"]
+    assert "stale" not in expired["meta"]
+
+
+def test_prewarm_fills_cache_for_default_dashboard_view(monkeypatch):
+    clear_fetch_cache()
+    calls = {"count": 0}
+
+    async def counting_mock(*args, **kwargs):
+        calls["count"] += 1
+        return _mock_fetch_all_assets(*args, **kwargs)
+
+    monkeypatch.setattr("backend.app.main.fetch_all_assets_async", counting_mock)
+    asyncio.run(_prewarm(PrewarmTarget("monedas", "YTD", "D")))
+
+    labels = [row["label"] for row in TestClient(app).get("/api/assets?market=monedas").json()["assets"]]
+    today = date.today()
+    response = TestClient(app).post(
+        "/api/fetch",
+        json={
+            **_payload(),
+            "market": "monedas",
+            "start_date": date(today.year, 1, 1).isoformat(),
+            "end_date": today.isoformat(),
+            "assets": labels,
+            "included_assets": labels,
+        },
+    )
+
+    assert response.status_code == 200
+    assert calls["count"] == 1
+
+
+def test_prewarm_skips_views_refreshed_by_another_worker(monkeypatch):
+    clear_fetch_cache()
+    clock = {"now": 10_000.0}
+    monkeypatch.setattr(fetch_cache, "_now", lambda: clock["now"])
+    calls = {"count": 0}
+
+    async def counting_mock(*args, **kwargs):
+        calls["count"] += 1
+        return _mock_fetch_all_assets(*args, **kwargs)
+
+    monkeypatch.setattr("backend.app.main.fetch_all_assets_async", counting_mock)
+    target = PrewarmTarget("indices_etfs", "YTD", "D")
+
+    asyncio.run(_prewarm(target))
+    clock["now"] += 5
+    asyncio.run(_prewarm(target))
+    assert calls["count"] == 1
+
+    clock["now"] += fetch_cache.DEFAULT_FETCH_CACHE_TTL - 20
+    asyncio.run(_prewarm(target))
+    assert calls["count"] == 2
+
+
+def test_fetch_columnar_format_ships_base_once_with_view_spec(monkeypatch):
+    clear_fetch_cache()
+    monkeypatch.setattr("backend.app.main.fetch_all_assets_async", _mock_fetch_all_assets_async)
+    client = TestClient(app)
+    payload = {**_payload(), "invert_global": True}
+
+    records = client.post("/api/fetch", json=payload).json()
+    columnar = client.post("/api/fetch?format=columnar", json=payload).json()
+
+    assert "base_rows" not in columnar and "view_rows" not in columnar
+    assert columnar["series"] == {"dates": ["2026-02-13", "2026-02-16"], "columns": {"S&P 500": [6021.1, 6055.2]}}
+    assert columnar["view"] == [{"label": "S&P 500", "source": "S&P 500", "invert": True}]
+    view_values = [
+        round(1 / value, columnar["view_decimals"]) for value in columnar["series"]["columns"]["S&P 500"]
+    ]
+    assert view_values == [row["S&P 500"] for row in records["view_rows"]]
+    assert columnar["snapshot_rows"] == records["snapshot_rows"]
+
+
+def test_export_arrow_round_trips_view_and_metadata(monkeypatch):
+    clear_fetch_cache()
+    pa = pytest.importorskip("pyarrow")
+    monkeypatch.setattr("backend.app.main.fetch_all_assets", _mock_fetch_all_assets)
+    client = TestClient(app)
+
+    response = client.post("/api/export/arrow", json=_payload())
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    frame = table.to_pandas()
+    assert list(frame.columns) == ["S&P 500"]
+    assert frame["S&P 500"].tolist() == [6021.1, 6055.2]
+    activos = json.loads(table.schema.metadata[b"finboard:activos"])
+    assert activos == [{"Instrumento": "S&P 500", "Fuente": "fred", "Simbolo": "SP500"}]
+
+    parquet = client.post("/api/export/arrow?format=parquet", json=_payload())
+    assert parquet.status_code == 200
+    assert parquet.content[:4] == b"PAR1"
+
+
+def test_export_arrow_without_pyarrow_returns_501(monkeypatch):
+    clear_fetch_cache()
+    monkeypatch.setattr("backend.app.main.fetch_all_assets", _mock_fetch_all_assets)
+    monkeypatch.setattr("backend.app.services.market_data.pa", None)
+    client = TestClient(app)
+
+    response = client.post("/api/export/arrow", json=_payload())
+    assert response.status_code == 501
+
+
+def test_export_excel_streams_the_four_sheets(monkeypatch):
+    clear_fetch_cache()
+    monkeypatch.setattr("backend.app.main.fetch_all_assets", _mock_fetch_all_assets)
+    client = TestClient(app)
+
+    response = client.post("/api/export", json=_payload())
+    assert response.status_code == 200
+    assert 'filename="indices_etfs_view_B_2026-01-01_to_2026-02-16.xlsx"' in response.headers["content-disposition"]
+
+    workbook = openpyxl.load_workbook(io.BytesIO(response.content))
+    assert workbook.sheetnames == ["Datos", "Activos", "Snapshot", "Info"]
+    datos = workbook["Datos"]
+    assert [cell.value for cell in datos[1]] == [None, "S&P 500"]
+    assert datos["A2"].number_format == "YYYY-MM-DD HH:MM:SS"
+    assert datos["B3"].value == 6055.2
+    snapshot_header = [cell.value for cell in workbook["Snapshot"][1]]
+    assert "PrevClose" not in snapshot_header
+    assert workbook["Info"]["E2"].value == 2
+
+
+def test_export_reuses_fetch_frames_and_caches_workbook(monkeypatch):
+    clear_fetch_cache()
+    calls = {"fetch": 0, "write": 0}
+
+    async def counting_fetch(*args, **kwargs):
+        calls["fetch"] += 1
+        return _mock_fetch_all_assets(*args, **kwargs)
+
+    def unexpected_fetch(*args, **kwargs):
+        raise AssertionError("export should reuse the frames loaded by /api/fetch")
+
+    real_write_excel = main.write_excel
+
+    def counting_write(*args, **kwargs):
+        calls["write"] += 1
+        return real_write_excel(*args, **kwargs)
+
+    monkeypatch.setattr("backend.app.main.fetch_all_assets_async", counting_fetch)
+    monkeypatch.setattr("backend.app.main.fetch_all_assets", unexpected_fetch)
+    monkeypatch.setattr("backend.app.main.write_excel", counting_write)
+    client = TestClient(app)
+
+    assert client.post("/api/fetch", json=_payload()).status_code == 200
+    first = client.post("/api/export", json={**_payload(), "invert_global": True})
+    second = client.post("/api/export", json={**_payload(), "invert_global": True})
+
+    assert first.status_code == 200
+    assert second.content == first.content
+    assert calls == {"fetch": 1, "write": 1}
+
+
+def test_fetch_since_returns_only_rows_from_that_date(monkeypatch):
+    clear_fetch_cache()
+    monkeypatch.setattr("backend.app.main.fetch_all_assets_async", _mock_fetch_all_assets_async)
+    client = TestClient(app)
+
+    full = client.post("/api/fetch", json=_payload())
+    delta = client.post("/api/fetch?since=2026-02-16", json=_payload())
+    columnar = client.post("/api/fetch?format=columnar&since=2026-02-16", json=_payload()).json()
+    unchanged = client.post("/api/fetch?since=2026-01-01", json=_payload())
+
+    body = delta.json()
+    assert len(delta.content) < len(full.content)
+    assert body["meta"]["delta"] is True and body["meta"]["since"] == "2026-02-16"
+    assert body["base_rows"] == [{"date": "2026-02-16", "S&P 500": 6055.2}]
+    assert body["view_rows"] == full.json()["view_rows"][-1:]
+    assert body["snapshot_rows_raw"] == full.json()["snapshot_rows_raw"]
+    assert columnar["series"] == {"dates": ["2026-02-16"], "columns": {"S&P 500": [6055.2]}}
+    assert unchanged.content == full.content
@@ -0,0 +1,81 @@
+import datetime as dt
+import json
+
+import numpy as np
+
+from backend.app.services import fetch_cache
+
+
+def test_cache_hit_returns_same_serialized_entry():
+    fetch_cache.clear_fetch_cache()
+    payload = {
+        "meta": {"market": "indices_etfs", "freq": "B"},
+        "base_rows": [{"date": "2026-02-16", "S&P 500": np.float64(6055.2), "DAX": None}],
+    }
+
+    stored = fetch_cache.set_fetch_cache("key", payload)
+    payload["base_rows"].clear()
+    hit = fetch_cache.get_fetch_cache("key")
+
+    assert hit is stored
+    assert hit.meta["freq"] == "B"
+    assert json.loads(hit.body)["base_rows"] == [{"date": "2026-02-16", "S&P 500": 6055.2, "DAX": None}]
+
+
+def test_lru_ttl_cache_evicts_by_recency_bytes_and_expiry(monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(fetch_cache, "_now", lambda: clock["now"])
+    cache = fetch_cache.LruTtlCache(max_items=3, max_bytes=25)
+
+    cache.set("a", b"x" * 10, ttl_seconds=60)
+    cache.set("b", b"x" * 10, ttl_seconds=5)
+    assert cache.get("a") is not None
+    cache.set("c", b"x" * 10, ttl_seconds=60)
+
+    # Over the byte budget: "b" is the least recently used entry.
+    assert cache.get("b") is None
+    assert cache.total_bytes == 20
+    assert len(cache) == 2
+
+    clock["now"] += 61
+    cache.set("d", b"x" * 5, ttl_seconds=60)
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+    assert cache.get("d") == b"x" * 5
+    assert cache.total_bytes == 5
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = tmp_path / "fetch_cache.sqlite3"
+    worker_a = fetch_cache.SqliteTtlCache(path, max_items=2, max_bytes=1024)
+    worker_b = fetch_cache.SqliteTtlCache(path, max_items=2, max_bytes=1024)
+
+    entry = fetch_cache.freeze_payload({"meta": {"freq": "B"}, "base_rows": []})
+    worker_a.set("k1", entry, ttl_seconds=60)
+    hit = worker_b.get("k1")
+
+    assert hit is not None
+    assert hit.body == entry.body
+    assert hit.meta["freq"] == "B"
+
+    worker_b.set("k2", entry, ttl_seconds=60)
+    worker_b.set("k3", entry, ttl_seconds=60)
+    assert len(worker_a) == 2
+    assert worker_a.get("k3") is not None
+
+
+def test_serialize_payload_handles_nan_numpy_and_dates():
+    payload = {
+        "meta": {"sdate": dt.date(2026, 2, 16)},
+        "rows": [{"close": float("nan"), "volume": np.int64(3), "high": np.float64(1.5)}],
+        "column": np.array([1.0, np.nan]),
+    }
+
+    body = fetch_cache.serialize_payload(payload)
+
+    assert body.startswith(b'{"meta":{')
+    assert json.loads(body) == {
+        "meta": {"sdate": "2026-02-16"},
+        "rows": [{"close": None, "volume": 3, "high": 1.5}],
+        "column": [1.0, None],
+    }
@@ -0,0 +1,638 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pandas as pd
+
+from backend.app.services import (
+    async_clients,
+    currency_memo,
+    failure_backoff,
+    provider_guard,
+    fetch_cache,
+    http_clients,
+    market_data,
+    series_store,
+    source_slots,
+)
+
+
+def _ohlc_frame(close: list[float]) -> pd.DataFrame:
+    index = pd.bdate_range("2026-02-10", periods=len(close))
+    return pd.DataFrame(
+        {"open": close, "high": close, "low": close, "close": close},
+        index=index,
+    )
+
+
+def test_fetch_all_assets_parallel_keeps_label_order_and_progress(monkeypatch):
+    failure_backoff.clear_failure_backoff()
+    lock = threading.Lock()
+    active = {"yahoo": 0}
+    peak = {"yahoo": 0}
+
+    def fake_get_asset_frame(market, instrument, start, end, freq, fred_key, indices_asset_map=None, yahoo_batch=None):
+        source = indices_asset_map[instrument]["src"]
+        with lock:
+            active[source] = active.get(source, 0) + 1
+            peak[source] = max(peak.get(source, 0), active[source])
+        time.sleep(0.02)
+        with lock:
+            active[source] -= 1
+        if instrument == "IBDR (ETF)":
+            return market_data._empty_ohlc_frame(), ""
+        return _ohlc_frame([100.0, 101.0]), indices_asset_map[instrument]["id"]
+
+    monkeypatch.setattr(market_data, "get_asset_frame", fake_get_asset_frame)
+    monkeypatch.setattr(market_data, "prefetch_yahoo_batch", lambda *args, **kwargs: {})
+    monkeypatch.setitem(market_data._SOURCE_SEMAPHORES, "yahoo", source_slots.SourceSemaphore(2))
+
+    labels = [
+        "Bitcoin (BTC-USD)",
+        "S&P 500",
+        "IBDR (ETF)",
+        "Gold (GC=F)",
+        "DAX",
+        "Ethereum (ETH-USD)",
+        "Silver (SI=F)",
+    ]
+    events: list[tuple[int, int, str, str]] = []
+
+    base_df, snapshot_df, failures, resolved = market_data.fetch_all_assets(
+        market="indices_etfs",
+        labels=labels,
+        start="2026-02-01",
+        end="2026-02-16",
+        freq="B",
+        fred_key="",
+        progress_hook=lambda *event: events.append(event),
+        max_workers=6,
+    )
+
+    assert list(base_df.columns) == [label for label in labels if label != "IBDR (ETF)"]
+    assert failures == ["IBDR (ETF)"]
+    assert list(resolved) == list(base_df.columns)
+    assert len(snapshot_df) == len(labels) - 1
+    assert peak["yahoo"] <= 2
+
+    finished = [event for event in events if event[3] in {"loaded", "failed"}]
+    assert sorted(event[0] for event in finished) == list(range(1, len(labels) + 1))
+    assert {event[2] for event in events if event[3] == "fetching"} == set(labels)
+    assert [event[3] for event in finished if event[2] == "IBDR (ETF)"] == ["failed"]
+
+
+def test_series_store_tops_up_only_missing_tail(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_STORE_ENABLED", True)
+    calls: list[tuple[str, str]] = []
+    history = _ohlc_frame([float(value) for value in range(100, 110)])
+
+    def fetcher(start: str, end: str) -> pd.DataFrame:
+        calls.append((start, end))
+        return history.loc[start:end]
+
+    first = series_store.load_ohlc("yahoo", "GC=F", "2026-02-10", "2026-02-17", fetcher)
+    again = series_store.load_ohlc("yahoo", "GC=F", "2026-02-11", "2026-02-16", fetcher)
+    extended = series_store.load_ohlc("yahoo", "GC=F", "2026-02-10", "2026-02-23", fetcher)
+
+    assert calls == [("2026-02-10", "2026-02-17"), ("2026-02-16", "2026-02-23")]
+    assert first["close"].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0, 105.0]
+    assert again["close"].tolist() == [101.0, 102.0, 103.0, 104.0]
+    assert extended.index[-1] == pd.Timestamp("2026-02-23")
+    assert extended["close"].tolist() == [float(value) for value in range(100, 110)]
+
+
+def test_provider_calls_reuse_pooled_session(monkeypatch):
+    http_clients.close_sessions()
+    seen: list[tuple[int, str]] = []
+
+    class FakeResponse:
+        status_code = 200
+
+        def raise_for_status(self) -> None:
+            return None
+
+        def json(self) -> dict:
+            return {"observations": [{"date": "2026-02-16", "value": "6055.2"}], "seriess": []}
+
+    def fake_get(self, url, params=None, headers=None, timeout=None):
+        seen.append((id(self), url))
+        return FakeResponse()
+
+    monkeypatch.setattr(http_clients.requests.Session, "get", fake_get)
+
+    market_data.fetch_fred_close("SP500", "2026-02-01", "2026-02-16", "key")
+    market_data.fetch_fred_close("DJIA", "2026-02-01", "2026-02-16", "key")
+    market_data.search_fred_instruments("gold", api_key="key")
+
+    assert len({session_id for session_id, _ in seen}) == 1
+    assert len(seen) == 3
+    adapter = http_clients.get_session("fred").get_adapter("https://api.stlouisfed.org")
+    assert adapter.max_retries.total == http_clients.HTTP_RETRIES
+    http_clients.close_sessions()
+
+
+def test_fetch_all_assets_async_uses_async_clients(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_STORE_ENABLED", False)
+    fetch_cache.clear_series_cache()
+    requested: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        series_id = request.url.params["series_id"]
+        requested.append(series_id)
+        observations = [
+            {"date": "2026-02-13", "value": "100.0"},
+            {"date": "2026-02-16", "value": "101.0" if series_id == "SP500" else "."},
+        ]
+        return httpx.Response(200, json={"observations": observations})
+
+    monkeypatch.setattr(
+        async_clients,
+        "_build_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    events: list[tuple[int, int, str, str]] = []
+
+    base_df, snapshot_df, failures, resolved = asyncio.run(
+        market_data.fetch_all_assets_async(
+            market="indices_etfs",
+            labels=["Nasdaq Comp", "S&P 500", "Dow Jones"],
+            start="2026-02-13",
+            end="2026-02-16",
+            freq="B",
+            fred_key="key",
+            progress_hook=lambda *event: events.append(event),
+        )
+    )
+
+    assert sorted(requested) == ["DJIA", "NASDAQCOM", "SP500"]
+    assert list(base_df.columns) == ["Nasdaq Comp", "S&P 500", "Dow Jones"]
+    assert base_df.loc["2026-02-16", "S&P 500"] == 101.0
+    assert failures == []
+    assert resolved["S&P 500"] == "SP500"
+    assert len(snapshot_df) == 3
+    assert sorted(event[0] for event in events if event[3] == "loaded") == [1, 2, 3]
+
+
+def test_yahoo_prefetch_batches_symbols_and_leaves_misses_to_workers(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_STORE_ENABLED", False)
+    fetch_cache.clear_series_cache()
+    downloads: list[object] = []
+    fallbacks: list[str] = []
+    frame = _ohlc_frame([100.0, 101.0])
+
+    def fake_download(tickers, **kwargs):
+        downloads.append(tickers)
+        columns = pd.MultiIndex.from_product([["GC=F", "SI=F"], ["Open", "High", "Low", "Close"]])
+        data = pd.concat([frame.rename(columns=str.title)] * 2, axis=1)
+        data.columns = columns
+        return data
+
+    def fake_fetch_yahoo_ohlc(symbol, start, end, retries=3):
+        fallbacks.append(symbol)
+        return frame
+
+    monkeypatch.setattr(market_data.yf, "download", fake_download)
+    monkeypatch.setattr(market_data, "fetch_yahoo_ohlc", fake_fetch_yahoo_ohlc)
+
+    batch = market_data.prefetch_yahoo_batch(
+        "indices_etfs",
+        ["Gold (GC=F)", "Silver (SI=F)", "Bitcoin (BTC-USD)", "S&P 500"],
+        "2026-02-10",
+        "2026-02-11",
+    )
+
+    assert downloads == [["GC=F", "SI=F", "BTC-USD"]]
+    assert fallbacks == []
+    assert set(batch) == {(symbol, "2026-02-10", "2026-02-11") for symbol in ["GC=F", "SI=F"]}
+    assert batch[("SI=F", "2026-02-10", "2026-02-11")]["close"].tolist() == [100.0, 101.0]
+
+
+def test_stooq_requests_window_and_reuses_parsed_frame(monkeypatch):
+    market_data.clear_stooq_frames()
+    requested: list[dict] = []
+
+    class FakeResponse:
+        status_code = 200
+        text = "Date,Open,High,Low,Close,Volume\n2026-02-12,1,1,1,21000,0\n2026-02-13,1,1,1,21100,0\n2026-02-16,1,1,1,21200,0\n"
+
+        def raise_for_status(self) -> None:
+            return None
+
+    def fake_provider_get(provider, url, *, params=None, headers=None, timeout=None):
+        requested.append(params)
+        return FakeResponse()
+
+    monkeypatch.setattr(market_data, "provider_get", fake_provider_get)
+
+    first = market_data.fetch_stooq_ohlc("^DAX", "2026-02-12", "2026-02-16")
+    inner = market_data.fetch_stooq_ohlc("^DAX", "2026-02-13", "2026-02-16")
+    wider = market_data.fetch_stooq_ohlc("^DAX", "2026-02-01", "2026-02-16")
+
+    assert requested[0] == {"s": "^DAX", "i": "d", "d1": "20260212", "d2": "20260216"}
+    assert len(requested) == 2
+    assert requested[1]["d1"] == "20260201"
+    assert first["close"].tolist() == [21000.0, 21100.0, 21200.0]
+    assert inner["close"].tolist() == [21100.0, 21200.0]
+    assert len(wider) == 3
+    market_data.clear_stooq_frames()
+
+
+def test_currency_winner_is_remembered_and_probed_first(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_STORE_ENABLED", False)
+    currency_memo.reset_currency_memo()
+    requested: list[str] = []
+
+    def fake_fetch_yahoo_ohlc(symbol, start, end, retries=3):
+        requested.append(symbol)
+        if symbol == "DOP=X":
+            time.sleep(0.05)
+            return _ohlc_frame([58.9, 59.1])
+        return market_data._empty_ohlc_frame()
+
+    monkeypatch.setattr(market_data, "fetch_yahoo_ohlc", fake_fetch_yahoo_ohlc)
+
+    first, first_ticker = market_data.get_currency_frame("DOP/USD", "2026-02-10", "2026-02-11", "B")
+    assert first_ticker == "DOP=X"
+    assert sorted(requested) == ["DOP=X", "DOPUSD=X", "USDDOP=X"]
+    assert requested[0] == "USDDOP=X"
+
+    currency_memo.reset_currency_memo()
+    requested.clear()
+    second, second_ticker = market_data.get_currency_frame("DOP/USD", "2026-02-10", "2026-02-11", "B")
+
+    assert second_ticker == "DOP=X"
+    assert requested == ["DOP=X"]
+    assert second["close"].tolist() == first["close"].tolist()
+    currency_memo.reset_currency_memo()
+
+
+def test_source_semaphore_is_shared_by_threads_and_event_loops():
+    semaphore = source_slots.SourceSemaphore(1)
+    order: list[str] = []
+    held = threading.Event()
+    release = threading.Event()
+
+    def export_worker() -> None:
+        with semaphore:
+            order.append("thread")
+            held.set()
+            release.wait()
+
+    async def scenario() -> None:
+        waiting = asyncio.create_task(semaphore.acquire_async())
+        cancelled = asyncio.create_task(semaphore.acquire_async())
+        await asyncio.sleep(0.02)
+        assert not waiting.done()
+        cancelled.cancel()
+        release.set()
+        await waiting
+        order.append("loop")
+        semaphore.release()
+
+    thread = threading.Thread(target=export_worker)
+    thread.start()
+    held.wait()
+    asyncio.run(scenario())
+    thread.join()
+
+    assert order == ["thread", "loop"]
+    with semaphore:
+        pass
+
+
+def test_parallel_currency_probes_share_the_yahoo_limit(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_STORE_ENABLED", False)
+    currency_memo.reset_currency_memo()
+    fetch_cache.clear_series_cache()
+    failure_backoff.clear_failure_backoff()
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+
+    def fake_fetch_yahoo_ohlc(symbol, start, end, retries=3):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+        return market_data._empty_ohlc_frame()
+
+    monkeypatch.setattr(market_data, "fetch_yahoo_ohlc", fake_fetch_yahoo_ohlc)
+    monkeypatch.setattr(market_data, "prefetch_yahoo_batch", lambda *args, **kwargs: {})
+    monkeypatch.setitem(market_data._SOURCE_SEMAPHORES, "yahoo", source_slots.SourceSemaphore(2))
+    labels = ["DOP/USD", "EUR/USD", "USD/JPY", "GBP/USD"]
+
+    _, _, failures, _ = market_data.fetch_all_assets(
+        "monedas", labels, "2026-02-10", "2026-02-11", "B", "", max_workers=4
+    )
+
+    assert failures == labels
+    assert active["peak"] <= 2
+    currency_memo.reset_currency_memo()
+
+
+def test_failing_symbol_cools_down_with_exponential_backoff(monkeypatch):
+    failure_backoff.clear_failure_backoff()
+    clock = {"now": 1_000.0}
+    monkeypatch.setattr(failure_backoff, "_now", lambda: clock["now"])
+    monkeypatch.setattr(failure_backoff, "FAILURE_BACKOFF_BASE_SECONDS", 60)
+    monkeypatch.setattr(market_data, "prefetch_yahoo_batch", lambda *args, **kwargs: {})
+    calls: list[str] = []
+
+    def fake_get_asset_frame(market, instrument, start, end, freq, fred_key, indices_asset_map=None, yahoo_batch=None):
+        calls.append(instrument)
+        if instrument == "IBDR (ETF)":
+            return market_data._empty_ohlc_frame(), ""
+        return _ohlc_frame([100.0, 101.0]), indices_asset_map[instrument]["id"]
+
+    monkeypatch.setattr(market_data, "get_asset_frame", fake_get_asset_frame)
+    labels = ["Gold (GC=F)", "IBDR (ETF)"]
+
+    def run() -> list[tuple[int, int, str, str]]:
+        events: list[tuple[int, int, str, str]] = []
+        market_data.fetch_all_assets(
+            market="indices_etfs",
+            labels=labels,
+            start="2026-02-02",
+            end="2026-02-11",
+            freq="B",
+            fred_key="",
+            progress_hook=lambda *event: events.append(event),
+            max_workers=1,
+        )
+        return events
+
+    run()
+    assert market_data.asset_cooldowns("indices_etfs", labels) == {"IBDR (ETF)": 1_060.0}
+
+    calls.clear()
+    events = run()
+    assert calls == ["Gold (GC=F)"]
+    assert ("IBDR (ETF)", "skipped") in [(event[2], event[3]) for event in events]
+
+    clock["now"] = 1_061.0
+    run()
+    assert market_data.asset_cooldowns("indices_etfs", labels) == {"IBDR (ETF)": 1_061.0 + 120}
+    failure_backoff.clear_failure_backoff()
+
+
+def test_empty_weekend_window_does_not_start_a_cooldown(monkeypatch):
+    failure_backoff.clear_failure_backoff()
+    monkeypatch.setattr(market_data, "prefetch_yahoo_batch", lambda *args, **kwargs: {})
+    monkeypatch.setattr(
+        market_data,
+        "get_asset_frame",
+        lambda *args, **kwargs: (market_data._empty_ohlc_frame(), ""),
+    )
+
+    _, _, failures, _ = market_data.fetch_all_assets(
+        "indices_etfs", ["Gold (GC=F)"], "2026-02-14", "2026-02-15", "B", "", max_workers=1
+    )
+
+    assert failures == ["Gold (GC=F)"]
+    assert market_data.asset_cooldowns("indices_etfs", ["Gold (GC=F)"]) == {}
+
+
+def test_circuit_breaker_fails_fast_and_serves_stored_series(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_STORE_ENABLED", True)
+    monkeypatch.setattr(series_store, "SERIES_STORE_TAIL_TTL_SECONDS", 0)
+    monkeypatch.setattr(provider_guard, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    clock = {"now": 100.0}
+    monkeypatch.setattr(provider_guard, "_now", lambda: clock["now"])
+    provider_guard.reset_provider_guards()
+    market_data.clear_stooq_frames()
+    sent: list[dict] = []
+
+    class FakeResponse:
+        def __init__(self, status_code: int) -> None:
+            self.status_code = status_code
+            self.text = "Date,Open,High,Low,Close\n2026-02-12,1,1,1,21000\n2026-02-13,1,1,1,21100\n"
+
+        def raise_for_status(self) -> None:
+            if self.status_code >= 400:
+                raise http_clients.requests.HTTPError(str(self.status_code))
+
+    def fake_get(self, url, params=None, headers=None, timeout=None):
+        sent.append(params)
+        return FakeResponse(200 if len(sent) == 1 else 503)
+
+    monkeypatch.setattr(http_clients.requests.Session, "get", fake_get)
+
+    stored = series_store.load_ohlc(
+        "stooq", "^DAX", "2026-02-12", "2026-02-13", lambda s, e: market_data.fetch_stooq_ohlc("^DAX", s, e)
+    )
+    assert stored["close"].tolist() == [21000.0, 21100.0]
+
+    for _ in range(2):
+        try:
+            market_data.fetch_stooq_ohlc("^NKX", "2026-02-12", "2026-02-13")
+        except http_clients.requests.HTTPError:
+            pass
+    status = {row["provider"]: row for row in provider_guard.providers_status()}
+    assert status["stooq"]["state"] == "open"
+    assert status["fred"]["state"] == "closed"
+
+    market_data.clear_stooq_frames()
+    calls_before = len(sent)
+    stale = series_store.load_ohlc(
+        "stooq", "^DAX", "2026-02-12", "2026-02-16", lambda s, e: market_data.fetch_stooq_ohlc("^DAX", s, e)
+    )
+    assert len(sent) == calls_before
+    assert stale["close"].tolist() == [21000.0, 21100.0]
+
+    clock["now"] += provider_guard.CIRCUIT_RESET_SECONDS + 1
+    assert provider_guard.get_guard("stooq").reserve() == 0.0
+    assert provider_guard.get_guard("stooq").status()["state"] == "half_open"
+    provider_guard.reset_provider_guards()
+    market_data.clear_stooq_frames()
+
+
+def test_frequency_switch_resamples_cached_base_without_refetch(monkeypatch):
+    fetch_cache.clear_series_cache()
+    calls: list[str | None] = []
+    raw = pd.DataFrame(
+        {
+            "open": [1.0, 2.0, 3.0, 4.0],
+            "high": [1.5, 2.5, 3.5, 4.5],
+            "low": [0.5, 1.5, 2.5, 3.5],
+            "close": [1.2, 2.2, 3.2, 4.2],
+        },
+        index=pd.to_datetime(["2026-01-29", "2026-01-30", "2026-02-02", "2026-02-06"]),
+    )
+
+    def fake_get_indices_frame(label, start, end, freq, fred_key, asset_map=None, yahoo_batch=None):
+        calls.append(freq)
+        return raw, "GC=F"
+
+    monkeypatch.setattr(market_data, "get_indices_frame", fake_get_indices_frame)
+    frames = {
+        freq: market_data.get_asset_frame("indices_etfs", "Gold (GC=F)", "2026-01-29", "2026-02-06", freq, "")[0]
+        for freq in ["W", "M", "B", "W"]
+    }
+
+    assert calls == [None]
+    assert frames["W"]["close"].tolist() == [2.2, 4.2]
+    assert frames["W"].index[-1] == pd.Timestamp("2026-02-06")
+    assert frames["M"]["high"].tolist() == [2.5, 4.5]
+    assert len(frames["B"]) == 7
+
+
+def test_detail_fetches_union_window_once_for_history_and_52_week_range(monkeypatch):
+    fetch_cache.clear_series_cache()
+    calls: list[tuple[str, str]] = []
+    index = pd.bdate_range("2025-01-02", "2026-02-06")
+    close = pd.Series(range(len(index)), index=index, dtype=float) + 100.0
+    close.loc["2025-01-03"] = 50.0
+    close.loc["2025-03-03"] = 60.0
+    close.loc["2026-01-05"] = 900.0
+    raw = pd.DataFrame({"open": close, "high": close, "low": close, "close": close})
+
+    async def fake_get_indices_frame(label, start, end, freq, fred_key, asset_map=None, yahoo_batch=None):
+        calls.append((start, end))
+        return raw.loc[start:end], "GC=F"
+
+    monkeypatch.setattr(market_data, "get_indices_frame_async", fake_get_indices_frame)
+    payload = asyncio.run(
+        market_data.get_detail_payload_async("indices_etfs", "Gold (GC=F)", "2026-01-26", "2026-02-06", "D", True, "")
+    )
+    inverted = asyncio.run(
+        market_data.get_detail_payload_async(
+            "indices_etfs", "Gold (GC=F)", "2026-01-26", "2026-02-06", "D", True, "", invert=True
+        )
+    )
+
+    assert calls == [("2025-02-01", "2026-02-06")]
+    assert payload["history"][0]["date"] == "2026-01-26"
+    assert payload["history"][-1]["date"] == "2026-02-06"
+    # 2025-01-03 falls outside the trailing 370 days; 2025-03-03 is inside.
+    assert payload["stats"]["week_52_range"] == [60.0, 900.0]
+    assert inverted["stats"]["week_52_range"] == [1 / 900.0, 1 / 60.0]
+
+
+def test_history_serializers_match_row_by_row_output():
+    frame = pd.DataFrame(
+        {
+            "open": [2.0, float("nan"), 1.0],
+            "high": [2.5, 3.5, 1.5],
+            "low": [1.5, 2.5, 0.5],
+            "close": [2.2, 3.2, float("nan")],
+        },
+        index=pd.to_datetime(["2026-02-03", "2026-02-04", "2026-02-02"]),
+    )
+
+    assert market_data._to_history_records(frame) == [
+        {"date": "2026-02-02", "open": 1.0, "high": 1.5, "low": 0.5, "close": None},
+        {"date": "2026-02-03", "open": 2.0, "high": 2.5, "low": 1.5, "close": 2.2},
+        {"date": "2026-02-04", "open": None, "high": 3.5, "low": 2.5, "close": 3.2},
+    ]
+    assert market_data._history_columns(frame) == {
+        "dates": ["2026-02-02", "2026-02-03", "2026-02-04"],
+        "columns": {
+            "open": [1.0, 2.0, None],
+            "high": [1.5, 2.5, 3.5],
+            "low": [0.5, 1.5, 2.5],
+            "close": [None, 2.2, 3.2],
+        },
+    }
+    assert market_data._to_history_records(frame.iloc[0:0]) == []
+
+
+def test_series_store_rechecks_empty_head_range_only_after_ttl(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_STORE_ENABLED", True)
+    history = _ohlc_frame([float(value) for value in range(100, 110)])
+    failing = {"on": False}
+    calls: list[tuple[str, str]] = []
+
+    def fetcher(start: str, end: str) -> pd.DataFrame:
+        calls.append((start, end))
+        return history.iloc[0:0] if failing["on"] else history.loc[start:end]
+
+    series_store.load_ohlc("yahoo", "GC=F", "2026-02-17", "2026-02-23", fetcher)
+    failing["on"] = True
+    degraded = series_store.load_ohlc("yahoo", "GC=F", "2026-02-10", "2026-02-23", fetcher)
+    failing["on"] = False
+    cached = series_store.load_ohlc("yahoo", "GC=F", "2026-02-10", "2026-02-23", fetcher)
+    assert len(degraded) == len(cached) == 5
+    assert calls == [("2026-02-17", "2026-02-23"), ("2026-02-10", "2026-02-16")]
+    assert series_store.get_coverage("yahoo", "GC=F")["start"] == "2026-02-10"
+
+    monkeypatch.setattr(series_store, "SERIES_STORE_EMPTY_HEAD_TTL_SECONDS", -1)
+    recovered = series_store.load_ohlc("yahoo", "GC=F", "2026-02-10", "2026-02-23", fetcher)
+
+    assert calls[-1] == ("2026-02-10", "2026-02-16")
+    assert recovered["close"].tolist() == [float(value) for value in range(100, 110)]
+
+
+def test_series_store_refetches_history_when_adjusted_closes_are_rebased(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_STORE_ENABLED", True)
+    monkeypatch.setattr(series_store, "SERIES_STORE_TAIL_TTL_SECONDS", -1)
+    history = {"frame": _ohlc_frame([float(value) for value in range(100, 106)])}
+    calls: list[tuple[str, str]] = []
+
+    def fetcher(start: str, end: str) -> pd.DataFrame:
+        calls.append((start, end))
+        return history["frame"].loc[start:end]
+
+    series_store.load_ohlc("yahoo", "IBDR", "2026-02-10", "2026-02-23", fetcher)
+    # A dividend after 2026-02-16 lowers every earlier adjusted close by 1%.
+    rebased = _ohlc_frame([float(value) for value in range(100, 110)])
+    rebased.loc[:"2026-02-16", "close"] *= 0.99
+    history["frame"] = rebased
+    frame = series_store.load_ohlc("yahoo", "IBDR", "2026-02-10", "2026-02-23", fetcher)
+
+    assert calls == [("2026-02-10", "2026-02-23"), ("2026-02-16", "2026-02-23"), ("2026-02-10", "2026-02-23")]
+    assert frame["close"].tolist() == rebased["close"].tolist()
+    assert series_store.get_coverage("yahoo", "IBDR")["rebased_at"] is not None
+
+
+def test_async_series_store_keeps_sqlite_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_STORE_ENABLED", True)
+    history = _ohlc_frame([float(value) for value in range(100, 110)])
+    store_threads: list[int] = []
+
+    def tracked(fn):
+        def wrapper(*args, **kwargs):
+            store_threads.append(threading.get_ident())
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(series_store, "get_coverage", tracked(series_store.get_coverage))
+    monkeypatch.setattr(series_store, "_merge_fetched", tracked(series_store._merge_fetched))
+
+    async def fetcher(start: str, end: str) -> pd.DataFrame:
+        return history.loc[start:end]
+
+    async def scenario() -> tuple[pd.DataFrame, int]:
+        frame = await series_store.load_ohlc_async("yahoo", "GC=F", "2026-02-10", "2026-02-17", fetcher)
+        return frame, threading.get_ident()
+
+    frame, loop_thread = asyncio.run(scenario())
+
+    assert frame["close"].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0, 105.0]
+    assert len(store_threads) == 2
+    assert loop_thread not in store_threads
+
+
+def test_yahoo_circuit_open_does_not_cool_symbols_down(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_STORE_ENABLED", False)
+    fetch_cache.clear_series_cache()
+    failure_backoff.clear_failure_backoff()
+    calls: list[object] = []
+
+    def open_circuit(provider, fn, is_failure=None):
+        calls.append(provider)
+        raise provider_guard.ProviderUnavailable(provider, "circuito abierto")
+
+    monkeypatch.setattr(market_data, "guarded_call", open_circuit)
+    labels = ["Gold (GC=F)", "Silver (SI=F)"]
+    base_df, _, failures, _ = market_data.fetch_all_assets(
+        "indices_etfs", labels, "2026-02-02", "2026-02-13", "B", ""
+    )
+
+    assert base_df.empty
+    assert failures == labels
+    assert market_data.asset_cooldowns("indices_etfs", labels) == {}
+    # Batch plus one attempt per label; no per-symbol retry loop while the circuit is open.
+    assert len(calls) == 3
@@ -0,0 +1,32 @@
+from datetime import datetime, time, timezone
+
+from backend.app.services.prewarm import (
+    PrewarmTarget,
+    parse_prewarm_targets,
+    prewarm_enabled_by_default,
+    seconds_until_next_run,
+)
+
+
+def test_parse_prewarm_targets_skips_invalid_entries():
+    targets = parse_prewarm_targets("indices_etfs:YTD:D, monedas:1Y:W,bonos:YTD:D,monedas:YTD:X,monedas:YTD:D")
+
+    assert targets == [
+        PrewarmTarget("indices_etfs", "YTD", "D"),
+        PrewarmTarget("monedas", "1Y", "W"),
+        PrewarmTarget("monedas", "YTD", "D"),
+    ]
+
+
+def test_next_run_aligns_to_provider_release_times():
+    now = datetime(2026, 2, 16, 21, 10, tzinfo=timezone.utc)
+
+    assert seconds_until_next_run(now, 600, [time(21, 15)]) == 300
+    assert seconds_until_next_run(now, 120, [time(21, 15)]) == 120
+    assert seconds_until_next_run(now, 86_400, [time(13, 30)]) == (16 * 60 + 20) * 60
+
+
+def test_prewarm_defaults_on_unless_workers_cannot_share_the_cache():
+    assert prewarm_enabled_by_default(1, "memory")
+    assert prewarm_enabled_by_default(4, "sqlite")
+    assert not prewarm_enabled_by_default(4, "memory")
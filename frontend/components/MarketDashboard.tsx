@@ -189,6 +189,7 @@ export function MarketDashboard({ market }: MarketDashboardProps) {
     query,
     meta,
     failures,
+    skipped,
     loading,
     error,
     patchQuery,
@@ -590,6 +591,11 @@ export function MarketDashboard({ market }: MarketDashboardProps) {
         {!!failures.length && (
           <div className="mb-3 rounded-lg border border-amber-200 bg-amber-50 px-3 py-2 text-sm text-amber-700">
             No se pudieron cargar: {failures.join(", ")}
+            {!!Object.keys(skipped).length && (
+              <span className="block text-xs">
+                En espera por fallos recientes (no se consultaron): {Object.keys(skipped).join(", ")}
+              </span>
+            )}
           </div>
         )}
 
@@ -100,6 +100,15 @@ function clampDateRange(
   return { startDate: nextStart, endDate: nextEnd };
 }
 
+function queryKey(query: DashboardQuery): string {
+  return JSON.stringify(query);
+}
+
+function mergeDeltaRows<T extends { date: string }>(previous: T[], incoming: T[], since: string): T[] {
+  // The delta restarts at `since`, so local rows from that day on are replaced rather than duplicated.
+  return [...previous.filter((row) => row.date < since), ...incoming];
+}
+
 function buildSeedQuery(
   market: MarketCode,
   catalogLabels: string[],
@@ -157,12 +166,15 @@ export function useDashboardData(market: MarketCode) {
   const [viewRows, setViewRows] = useState<SeriesRow[]>([]);
   const [snapshotRawRows, setSnapshotRawRows] = useState<SnapshotRow[]>([]);
   const [failures, setFailures] = useState<string[]>([]);
+  const [skipped, setSkipped] = useState<Record<string, string>>({});
   const [resolvedSymbols, setResolvedSymbols] = useState<Record<string, string>>({});
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const queryRef = useRef<DashboardQuery>(createInitialQuery(market));
   const bootstrappedRef = useRef(false);
+  // Query and last base-row date of what is on screen; an identical reload only asks for newer rows.
+  const loadedRef = useRef<{ key: string; lastDate: string } | null>(null);
 
   const commitQuery = useCallback((next: DashboardQuery) => {
     queryRef.current = next;
@@ -180,11 +192,18 @@ export function useDashboardData(market: MarketCode) {
 
   const applyFetchResponse = useCallback(
     (nextQuery: DashboardQuery, response: FetchResponse) => {
+      const since = response.meta.delta ? response.meta.since : undefined;
       setMeta(response.meta);
       setFailures(response.failures);
+      setSkipped(response.skipped || {});
       setAssetsLoaded(response.assets_loaded);
-      setBaseRows(response.base_rows);
-      setViewRows(response.view_rows);
+      if (since) {
+        setBaseRows((previous) => mergeDeltaRows(previous, response.base_rows, since));
+        setViewRows((previous) => mergeDeltaRows(previous, response.view_rows, since));
+      } else {
+        setBaseRows(response.base_rows);
+        setViewRows(response.view_rows);
+      }
       setSnapshotRawRows(response.snapshot_rows_raw);
       setResolvedSymbols(response.resolved_symbols || {});
 
@@ -192,17 +211,28 @@ export function useDashboardData(market: MarketCode) {
         nextQuery.includedAssets.length ? nextQuery.includedAssets : response.included_assets
       ).filter((label) => response.assets_loaded.includes(label));
 
-      commitQuery({
+      const committed = {
         ...nextQuery,
         includedAssets: validIncluded,
         invertedAssets: nextQuery.invertedAssets.filter((label) =>
           response.snapshot_rows_raw.some((row) => row.instrument === label)
         ),
-      });
+      };
+      commitQuery(committed);
+
+      const lastDate = response.base_rows.length
+        ? response.base_rows[response.base_rows.length - 1].date
+        : since && loadedRef.current?.lastDate;
+      loadedRef.current = lastDate ? { key: queryKey(committed), lastDate } : null;
     },
     [commitQuery]
   );
 
+  const deltaOptions = useCallback((nextQuery: DashboardQuery) => {
+    const loaded = loadedRef.current;
+    return loaded && loaded.key === queryKey(nextQuery) ? { since: loaded.lastDate } : undefined;
+  }, []);
+
   const loadData = useCallback(
     async (patch: Partial<DashboardQuery> = {}) => {
       const nextQuery = patchQuery(patch);
@@ -215,7 +245,7 @@ export function useDashboardData(market: MarketCode) {
       setLoading(true);
       setError(null);
       try {
-        const response = await fetchDashboard(nextQuery);
+        const response = await fetchDashboard(nextQuery, deltaOptions(nextQuery));
         applyFetchResponse(nextQuery, response);
       } catch (err) {
         const message = err instanceof Error ? err.message : "Error desconocido";
@@ -224,7 +254,7 @@ export function useDashboardData(market: MarketCode) {
         setLoading(false);
       }
     },
-    [applyFetchResponse, patchQuery]
+    [applyFetchResponse, deltaOptions, patchQuery]
   );
 
   const loadDataWithProgress = useCallback(
@@ -245,7 +275,7 @@ export function useDashboardData(market: MarketCode) {
       setLoading(true);
       setError(null);
       try {
-        const response = await fetchDashboardStream(nextQuery, { onProgress });
+        const response = await fetchDashboardStream(nextQuery, { onProgress }, deltaOptions(nextQuery));
         applyFetchResponse(nextQuery, response);
       } catch (err) {
         const message = err instanceof Error ? err.message : "Error desconocido";
@@ -255,7 +285,7 @@ export function useDashboardData(market: MarketCode) {
         setLoading(false);
       }
     },
-    [applyFetchResponse, patchQuery]
+    [applyFetchResponse, deltaOptions, patchQuery]
   );
 
   useEffect(() => {
@@ -301,6 +331,7 @@ export function useDashboardData(market: MarketCode) {
     viewRows,
     snapshotRawRows,
     failures,
+    skipped,
     resolvedSymbols,
     loading,
     error,
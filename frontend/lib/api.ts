@@ -45,8 +45,18 @@ function mapQueryToPayload(query: DashboardQuery) {
   };
 }
 
-export async function fetchDashboard(query: DashboardQuery): Promise<FetchResponse> {
-  const response = await fetch(`${API_BASE_URL}/api/fetch`, {
+export interface FetchOptions {
+  // Only rows dated on/after this day come back (meta.delta); the caller merges them.
+  since?: string;
+}
+
+function fetchUrl(path: string, options?: FetchOptions): string {
+  if (!options?.since) return `${API_BASE_URL}${path}`;
+  return `${API_BASE_URL}${path}?${new URLSearchParams({ since: options.since }).toString()}`;
+}
+
+export async function fetchDashboard(query: DashboardQuery, options?: FetchOptions): Promise<FetchResponse> {
+  const response = await fetch(fetchUrl("/api/fetch", options), {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(mapQueryToPayload(query)),
@@ -105,9 +115,10 @@ function parseSseBlock(rawBlock: string): { event: string; data: string } | null
 
 export async function fetchDashboardStream(
   query: DashboardQuery,
-  handlers?: { onProgress?: (progress: FetchStreamProgress) => void }
+  handlers?: { onProgress?: (progress: FetchStreamProgress) => void },
+  options?: FetchOptions
 ): Promise<FetchResponse> {
-  const response = await fetch(`${API_BASE_URL}/api/fetch/stream`, {
+  const response = await fetch(fetchUrl("/api/fetch/stream", options), {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(mapQueryToPayload(query)),
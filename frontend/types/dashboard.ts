@@ -41,6 +41,10 @@ export interface FetchMeta {
   freq: string;
   preset: string;
   last_update_utc: string;
+  stale?: boolean;
+  age_seconds?: number;
+  delta?: boolean;
+  since?: string;
 }
 
 export interface SeriesRow {
@@ -65,6 +69,7 @@ export interface SnapshotRow {
 export interface FetchResponse {
   meta: FetchMeta;
   failures: string[];
+  skipped?: Record<string, string>;
   resolved_symbols: Record<string, string>;
   assets_loaded: string[];
   included_assets: string[];
@@ -74,6 +79,18 @@ export interface FetchResponse {
   snapshot_rows: SnapshotRow[];
 }
 
+export interface ColumnarViewColumn {
+  label: string;
+  source: string;
+  invert: boolean;
+}
+
+export interface ColumnarFetchResponse extends Omit<FetchResponse, "base_rows" | "view_rows"> {
+  series: { dates: string[]; columns: Record<string, Array<number | null>> };
+  view: ColumnarViewColumn[];
+  view_decimals?: number;
+}
+
 export interface DashboardQuery {
   market: MarketCode;
   startDate: string;
@@ -132,6 +149,13 @@ export interface DetailResponse {
   };
 }
 
+export interface ColumnarDetailResponse extends Omit<DetailResponse, "history"> {
+  history: {
+    dates: string[];
+    columns: Record<"open" | "high" | "low" | "close", Array<number | null>>;
+  };
+}
+
 export interface DetailRequest {
   market: MarketCode;
   instrument: string;